@@ -5,7 +5,7 @@ Provides feedback window and assessment interface for personality profiling
 
 import json
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from .personality_profiler import PersonalityProfiler, PersonalityProfile
 from .adaptive_personality import AdaptivePersonality
 
@@ -239,20 +239,19 @@ class PersonalityAssessmentUI:
     
     def process_question_response(self, user_id: str, question_id: str, option_id: int) -> Dict:
         """Process user's response to assessment question"""
-        success = self.profiler.record_response(user_id, question_id, option_id)
-        
-        if not success:
-            return {"error": "Failed to record response"}
+        return self.bulk_answer(user_id, [(question_id, option_id)])
+    
+    def bulk_answer(self, user_id: str, answers: List[Tuple[str, int]]) -> Dict:
+        """Record several (question_id, option_id) responses, analyzing and saving the profile once"""
+        for question_id, option_id in answers:
+            if not self.profiler.record_response(user_id, question_id, option_id):
+                return {"error": f"Failed to record response for {question_id}"}
         
-        # Get next question or completion
         next_question = self.get_current_question_ui(user_id)
         
         if next_question and next_question.get("ui_type") == "assessment_complete":
-            # Assessment completed, analyze and save profile
             profile = self.profiler.analyze_responses(user_id)
             self.profiler.save_profile(profile)
-            
-            return next_question
         
         return next_question or {"error": "Assessment error"}
     
@@ -1,9 +1,12 @@
 """Token management utilities for AI model input validation and truncation."""
 
 import re
-from typing import Dict, Tuple
+from typing import Dict, Optional, Tuple
 from abc import ABC, abstractmethod
 
+# Compiled once at import; count_tokens runs on every prompt and truncation step
+_WORD_RE = re.compile(r'\b\w+\b')
+
 class TokenCounter(ABC):
     """Abstract base class for token counting strategies."""
     
@@ -17,7 +20,7 @@ class ApproximateTokenCounter(TokenCounter):
     
     def count_tokens(self, text: str) -> int:
         # Rough approximation: 1 token ≈ 0.75 words for English text
-        words = len(re.findall(r'\b\w+\b', text))
+        words = len(_WORD_RE.findall(text))
         return int(words / 0.75)
 
 class TokenManager:
@@ -74,23 +77,33 @@ class TokenManager:
         
         return provider_limits.get('default', 4000)
     
-    def validate_and_truncate(self, text: str, provider: str, model_name: str = None) -> Tuple[str, bool]:
+    def validate_and_truncate(self, text: str, provider: str, model_name: str = None,
+                              current_tokens: Optional[int] = None) -> Tuple[str, bool]:
         """
         Validate input length and truncate if necessary.
         
+        current_tokens may be passed when the caller has already counted text.
+        
         Returns:
             Tuple of (processed_text, was_truncated)
         """
         limit = self.get_model_limit(provider, model_name)
-        current_tokens = self.token_counter.count_tokens(text)
+        
+        # No tokenizer yields more than 4 tokens per character (UTF-8 bytes
+        # bound BPE tokens), so short inputs can skip counting entirely
+        if len(text) * 4 < limit:
+            return text, False
+        
+        if current_tokens is None:
+            current_tokens = self.token_counter.count_tokens(text)
         
         if current_tokens <= limit:
             return text, False
         
         # Need to truncate - use intelligent truncation
-        return self._intelligent_truncate(text, limit), True
+        return self._intelligent_truncate(text, limit, current_tokens), True
     
-    def _intelligent_truncate(self, text: str, max_tokens: int) -> str:
+    def _intelligent_truncate(self, text: str, max_tokens: int, current_tokens: Optional[int] = None) -> str:
         """
         Intelligently truncate text while preserving important content.
         
@@ -98,8 +111,11 @@ class TokenManager:
         1. Keep the beginning (context/question)
         2. Keep the end (conclusion/specific request)
         3. Summarize or remove middle content if needed
+        
+        current_tokens may be passed when the caller has already counted text.
         """
-        current_tokens = self.token_counter.count_tokens(text)
+        if current_tokens is None:
+            current_tokens = self.token_counter.count_tokens(text)
         
         if current_tokens <= max_tokens:
             return text
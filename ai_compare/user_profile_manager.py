@@ -2,11 +2,44 @@
 
 import json
 import os
+import tempfile
 import uuid
 from datetime import datetime
+from functools import lru_cache
 from typing import Dict, List, Optional, Any
 from pathlib import Path
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+def profile_to_json(profile: Dict) -> bytes:
+    """Serialize a profile as indented UTF-8 JSON, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(profile, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(profile, indent=2, ensure_ascii=False).encode('utf-8')
+
+def profile_from_json(data: bytes) -> Dict:
+    """Parse profile JSON bytes, using orjson when installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+@lru_cache(maxsize=128)
+def _read_profile_file(path: str, ino: int, mtime_ns: int, size: int) -> bytes:
+    """Read a profile file; keyed on inode/mtime/size so an unchanged file is read once.
+
+    Saves replace the file with a new inode, so a same-size rewrite within one
+    mtime tick still misses the cache.
+
+    The raw bytes are cached rather than the parsed dict, so every load parses
+    into fresh objects and in-place edits by callers never reach the cache.
+    """
+    with open(path, 'rb') as f:
+        return f.read()
+
 class UserProfileManager:
     """Manages user profiles and personal information storage."""
     
@@ -85,8 +118,12 @@ class UserProfileManager:
         
         if profile_file.exists():
             try:
-                with open(profile_file, 'r', encoding='utf-8') as f:
-                    profile_data = json.load(f)
+                if force_reload:
+                    data = profile_file.read_bytes()
+                else:
+                    stat = profile_file.stat()
+                    data = _read_profile_file(str(profile_file), stat.st_ino, stat.st_mtime_ns, stat.st_size)
+                profile_data = profile_from_json(data)
                 
                 # Update cache
                 self.profile_cache[user_id] = profile_data
@@ -103,9 +140,7 @@ class UserProfileManager:
             return False
         
         # Update personal info fields
-        for key, value in personal_info.items():
-            if key in profile["personal_info"]:
-                profile["personal_info"][key] = value
+        self._merge_section(profile, "personal_info", personal_info)
         
         profile["last_updated"] = datetime.now().isoformat()
         profile["metadata"]["profile_completion"] = self._calculate_completion(profile)
@@ -121,9 +156,7 @@ class UserProfileManager:
             return False
         
         # Update preference fields
-        for key, value in preferences.items():
-            if key in profile["preferences"]:
-                profile["preferences"][key] = value
+        self._merge_section(profile, "preferences", preferences)
         
         profile["last_updated"] = datetime.now().isoformat()
         profile["metadata"]["profile_completion"] = self._calculate_completion(profile)
@@ -139,9 +172,7 @@ class UserProfileManager:
             return False
         
         # Update privacy settings
-        for key, value in privacy_settings.items():
-            if key in profile["privacy_settings"]:
-                profile["privacy_settings"][key] = value
+        self._merge_section(profile, "privacy_settings", privacy_settings)
         
         profile["last_updated"] = datetime.now().isoformat()
         
@@ -151,36 +182,76 @@ class UserProfileManager:
     
     def record_interaction(self, user_id: str, interaction_data: Dict) -> bool:
         """Record AI interaction data."""
+        return self.record_interactions_bulk(user_id, [interaction_data])
+    
+    def record_interactions_bulk(self, user_id: str, interactions: List[Dict]) -> bool:
+        """Record several AI interactions with a single profile load and save."""
         profile = self.load_user_profile(user_id, force_reload=True)
         if not profile:
             return False
         
-        # Update interaction history
-        history = profile["ai_interaction_history"]
-        history["total_conversations"] += 1
+        self._apply_interactions(profile, interactions)
+        
+        self._save_profile(profile)
+        self.profile_cache[user_id] = profile
+        return True
+    
+    def update_all(self, user_id: str, sections: Dict) -> bool:
+        """
+        Apply several profile updates with a single load and save.
         
-        if "topic" in interaction_data:
-            if interaction_data["topic"] not in history["favorite_topics"]:
-                history["favorite_topics"].append(interaction_data["topic"])
+        sections may contain 'personal_info', 'preferences' and 'privacy_settings'
+        dicts and an 'interactions' list; each is applied like its dedicated method.
+        """
+        profile = self.load_user_profile(user_id, force_reload=True)
+        if not profile:
+            return False
         
-        if "model" in interaction_data:
-            if interaction_data["model"] not in history["preferred_models"]:
-                history["preferred_models"].append(interaction_data["model"])
+        for section in ("personal_info", "preferences", "privacy_settings"):
+            if section in sections:
+                self._merge_section(profile, section, sections[section])
         
-        if "feedback_score" in interaction_data:
-            history["feedback_scores"].append({
-                "score": interaction_data["feedback_score"],
-                "timestamp": datetime.now().isoformat()
-            })
+        if sections.get("interactions"):
+            self._apply_interactions(profile, sections["interactions"])
         
         profile["last_updated"] = datetime.now().isoformat()
-        profile["metadata"]["last_login"] = datetime.now().isoformat()
-        profile["metadata"]["session_count"] += 1
+        profile["metadata"]["profile_completion"] = self._calculate_completion(profile)
         
         self._save_profile(profile)
         self.profile_cache[user_id] = profile
         return True
     
+    def _merge_section(self, profile: Dict, section: str, values: Dict) -> None:
+        """Copy known keys from values into profile[section]."""
+        for key, value in values.items():
+            if key in profile[section]:
+                profile[section][key] = value
+    
+    def _apply_interactions(self, profile: Dict, interactions: List[Dict]) -> None:
+        """Add interactions to the profile's AI interaction history."""
+        history = profile["ai_interaction_history"]
+        
+        for interaction_data in interactions:
+            history["total_conversations"] += 1
+            
+            if "topic" in interaction_data:
+                if interaction_data["topic"] not in history["favorite_topics"]:
+                    history["favorite_topics"].append(interaction_data["topic"])
+            
+            if "model" in interaction_data:
+                if interaction_data["model"] not in history["preferred_models"]:
+                    history["preferred_models"].append(interaction_data["model"])
+            
+            if "feedback_score" in interaction_data:
+                history["feedback_scores"].append({
+                    "score": interaction_data["feedback_score"],
+                    "timestamp": datetime.now().isoformat()
+                })
+        
+        profile["last_updated"] = datetime.now().isoformat()
+        profile["metadata"]["last_login"] = datetime.now().isoformat()
+        profile["metadata"]["session_count"] += len(interactions)
+    
     def get_user_summary(self, user_id: str) -> Optional[Dict]:
         """Get a summary of user information for AI context."""
         profile = self.load_user_profile(user_id)
@@ -204,8 +275,8 @@ class UserProfileManager:
         
         for profile_file in self.storage_dir.glob("*.json"):
             try:
-                with open(profile_file, 'r', encoding='utf-8') as f:
-                    profile_data = json.load(f)
+                with open(profile_file, 'rb') as f:
+                    profile_data = profile_from_json(f.read())
                 
                 profile_info = {
                     "user_id": profile_data["user_id"],
@@ -229,11 +300,12 @@ class UserProfileManager:
         profile_file = self.storage_dir / f"{user_id}.json"
         
         try:
-            if profile_file.exists():
-                profile_file.unlink()
-            
-            if user_id in self.profile_cache:
-                del self.profile_cache[user_id]
+            # Unlink directly (no existence check or read); also drop any temp
+            # files an interrupted _save_profile left behind
+            profile_file.unlink(missing_ok=True)
+            for tmp_file in self.storage_dir.glob(f"{user_id}.*.json.tmp"):
+                tmp_file.unlink(missing_ok=True)
+            self.profile_cache.pop(user_id, None)
             
             return True
         except Exception as e:
@@ -247,7 +319,7 @@ class UserProfileManager:
             return None
         
         if format == "json":
-            return json.dumps(profile, indent=2, ensure_ascii=False)
+            return profile_to_json(profile).decode('utf-8')
         
         elif format == "txt":
             lines = [
@@ -302,29 +374,26 @@ class UserProfileManager:
         return int((completed_fields / total_fields) * 100) if total_fields > 0 else 0
     
     def _save_profile(self, profile_data: Dict) -> None:
-        """Save profile data to file."""
+        """Save profile data to file atomically (write temp file, then rename over)."""
         profile_file = self.storage_dir / f"{profile_data['user_id']}.json"
+        tmp_file = None
         
         try:
             # Ensure directory exists
             self.storage_dir.mkdir(exist_ok=True)
             
-            # Create backup of existing file
-            if profile_file.exists():
-                backup_file = profile_file.with_suffix('.json.bak')
-                profile_file.rename(backup_file)
-            
-            with open(profile_file, 'w', encoding='utf-8') as f:
-                json.dump(profile_data, f, indent=2, ensure_ascii=False)
+            # A unique temp file per save, so concurrent saves of one user never
+            # truncate or publish each other's half-written data
+            fd, tmp_file = tempfile.mkstemp(dir=self.storage_dir, prefix=f"{profile_data['user_id']}.",
+                                            suffix='.json.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(profile_to_json(profile_data))
             
-            # Remove backup on successful save
-            backup_file = profile_file.with_suffix('.json.bak')
-            if backup_file.exists():
-                backup_file.unlink()
+            # os.replace is atomic, so readers see either the old or the new file
+            os.replace(tmp_file, profile_file)
                 
         except Exception as e:
             print(f"Error saving profile {profile_data.get('user_id', 'unknown')}: {e}")
-            # Restore backup if save failed
-            backup_file = profile_file.with_suffix('.json.bak')
-            if backup_file.exists():
-                backup_file.rename(profile_file)
+            # The existing profile file is untouched; just drop the partial temp file
+            if tmp_file and os.path.exists(tmp_file):
+                os.unlink(tmp_file)
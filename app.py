@@ -1485,6 +1485,27 @@ def record_interaction():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/profile/interaction/bulk', methods=['POST'])
+def record_interactions_bulk():
+    """Record a list of user interactions with AI in one profile write"""
+    try:
+        data = request.get_json()
+        user_id = data.get('user_id')
+        interactions = data.get('interactions', [])
+        
+        if not user_id:
+            return jsonify({'error': 'User ID is required'}), 400
+        if not isinstance(interactions, list):
+            return jsonify({'error': 'interactions must be a list'}), 400
+        
+        success = user_profile_manager.record_interactions_bulk(user_id, interactions)
+        if success:
+            return jsonify({'success': True, 'message': f'{len(interactions)} interactions recorded'})
+        else:
+            return jsonify({'error': 'Failed to record interactions'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/psychological-assessment', methods=['POST'])
 def save_psychological_assessment():
     """Save psychological assessment results"""
@@ -0,0 +1,66 @@
+"""
+Small pool of launched Chromium browsers for the Playwright tests.
+
+Launching Chromium costs a few seconds, so tests acquire an already running
+browser from the pool and release it when done instead of launching their
+own.  Disconnected browsers are dropped on acquire/release (acquire launches
+a new one if none is left) and browsers left idle past `idle_timeout` are
+closed down to `min_size`.
+"""
+
+import time
+
+
+class BrowserPool:
+    def __init__(self, playwright, min_size=1, max_size=4, idle_timeout=60, **launch_kwargs):
+        self._pw = playwright
+        self._min = min_size
+        self._max = max_size
+        self._idle_timeout = idle_timeout
+        self._launch_kwargs = launch_kwargs
+        self._idle = []  # (browser, released_at)
+
+    async def _launch(self):
+        return await self._pw.chromium.launch(**self._launch_kwargs)
+
+    async def start(self):
+        """Pre-launch min_size browsers"""
+        for _ in range(self._min):
+            self._idle.append((await self._launch(), time.monotonic()))
+
+    async def acquire(self):
+        """Return an idle, connected browser, launching one if none is available"""
+        await self._evict_idle()
+        while self._idle:
+            browser, _ = self._idle.pop()
+            if browser.is_connected():
+                return browser
+        return await self._launch()
+
+    async def release(self, browser):
+        """Hand a browser back; dead or surplus browsers are closed instead of pooled"""
+        if not browser.is_connected():
+            return
+        if len(self._idle) >= self._max:
+            await browser.close()
+            return
+        self._idle.append((browser, time.monotonic()))
+
+    async def _evict_idle(self):
+        """Close browsers idle longer than idle_timeout, keeping at least min_size"""
+        cutoff = time.monotonic() - self._idle_timeout
+        remaining = len(self._idle)
+        keep = []
+        for browser, released_at in self._idle:
+            if released_at < cutoff and remaining > self._min:
+                await browser.close()
+                remaining -= 1
+            else:
+                keep.append((browser, released_at))
+        self._idle = keep
+
+    async def close(self):
+        """Close every pooled browser"""
+        for browser, _ in self._idle:
+            await browser.close()
+        self._idle = []
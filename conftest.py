@@ -0,0 +1,69 @@
+"""
+Shared pytest fixtures for the Playwright browser tests.
+
+Chromium instances come from a session-wide BrowserPool and every test gets a
+fresh context, so running several browser scripts under pytest pays the
+browser cold start only once per pooled browser.  The browser tests use the
+async Playwright API, so the fixtures drive their own event loop rather than
+pulling in pytest-asyncio.
+"""
+
+import asyncio
+import os
+import socket
+
+import pytest
+
+
+APP_HOST = "localhost"
+APP_PORT = 5000
+
+
+@pytest.fixture(scope="session")
+def app_server():
+    """Skip the requesting test unless the Flask app accepts TCP connections"""
+    try:
+        socket.create_connection((APP_HOST, APP_PORT), timeout=1).close()
+    except OSError:
+        pytest.skip(f"no server listening on {APP_HOST}:{APP_PORT}")
+    return f"http://{APP_HOST}:{APP_PORT}"
+
+
+@pytest.fixture(scope="session")
+def run_async():
+    """Run a coroutine to completion on the session's event loop"""
+    loop = asyncio.new_event_loop()
+    yield loop.run_until_complete
+    loop.close()
+
+
+@pytest.fixture(scope="session")
+def browser_pool(run_async):
+    # Imported here so non-browser tests still collect without Playwright installed
+    async_playwright = pytest.importorskip("playwright.async_api").async_playwright
+    from browser_pool import BrowserPool
+
+    p = run_async(async_playwright().start())
+    pool = BrowserPool(
+        p,
+        headless=os.environ.get('HEADED') != '1',
+        slow_mo=int(os.environ.get('SLOWMO', '0'))
+    )
+    run_async(pool.start())
+    yield pool
+    run_async(pool.close())
+    run_async(p.stop())
+
+
+@pytest.fixture
+def browser(browser_pool, run_async):
+    b = run_async(browser_pool.acquire())
+    yield b
+    run_async(browser_pool.release(b))
+
+
+@pytest.fixture
+def context(browser, run_async):
+    ctx = run_async(browser.new_context())
+    yield ctx
+    run_async(ctx.close())
@@ -0,0 +1,26 @@
+"""
+Shared SQLite connection for the verification and test scripts.
+
+The first call opens integrated_users.db in WAL mode (readers are not blocked
+by a concurrent writer such as the running Flask app) and later calls reuse
+the same connection.  It is closed automatically at interpreter exit.
+"""
+
+import atexit
+import sqlite3
+
+DB_PATH = 'integrated_users.db'
+
+_CONN = None
+
+
+def get_shared_conn():
+    """Return the process-wide connection to DB_PATH, opening it on first use"""
+    global _CONN
+    if _CONN is None:
+        _CONN = sqlite3.connect(DB_PATH)
+        _CONN.execute('PRAGMA journal_mode=WAL')
+        _CONN.execute('PRAGMA synchronous=NORMAL')
+        _CONN.execute('PRAGMA cache_size=-20000')
+        atexit.register(_CONN.close)
+    return _CONN
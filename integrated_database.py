@@ -4,7 +4,7 @@ import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any
 
 class IntegratedDatabase:
     """
@@ -12,6 +12,8 @@ class IntegratedDatabase:
     with AI chatbot conversation and personality management
     """
     
+    GUEST_DAILY_LIMIT = 20  # Daily message limit for guest users
+    
     def __init__(self, db_path: str = "integrated_users.db"):
         self.db_path = Path(db_path)
         self.init_database()
@@ -614,7 +616,8 @@ class IntegratedDatabase:
         result = cursor.fetchone()
         conn.close()
         
-        return result[0] if result else 'guest'
+        # A NULL role is a guest, matching the COALESCE in iter_user_role_summary
+        return (result[0] if result else None) or 'guest'
     
     def get_message_usage(self, user_id: int) -> Dict[str, Any]:
         """Get user's message usage for today"""
@@ -642,7 +645,7 @@ class IntegratedDatabase:
             limit = None  # Unlimited
             remaining = None
         else:  # guest
-            limit = 20  # Daily limit for guest users
+            limit = self.GUEST_DAILY_LIMIT
             remaining = max(0, limit - current_count)
         
         return {
@@ -653,6 +656,54 @@ class IntegratedDatabase:
             'can_send': remaining is None or remaining > 0
         }
     
+    def iter_user_role_summary(self, batch_size: int = 1000) -> Iterator[Dict[str, Any]]:
+        """Yield role and today's message usage for every user, reading rows in batches"""
+        conn = self.get_connection()
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        today = datetime.now().date().isoformat()
+        
+        try:
+            cursor.execute('''
+                WITH usage AS (
+                    SELECT user_id, message_count FROM message_usage WHERE date = ?
+                )
+                SELECT 
+                    u.id,
+                    u.username,
+                    COALESCE(u.user_role, 'guest') as role,
+                    COALESCE(usage.message_count, 0) as current_count,
+                    CASE WHEN COALESCE(u.user_role, 'guest') IN ('administrator', 'paid')
+                         THEN NULL ELSE ? END as daily_limit
+                FROM users u
+                LEFT JOIN usage ON usage.user_id = u.id
+                ORDER BY u.id
+            ''', (today, self.GUEST_DAILY_LIMIT))
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    limit = row['daily_limit']
+                    remaining = None if limit is None else max(0, limit - row['current_count'])
+                    yield {
+                        'id': row['id'],
+                        'username': row['username'],
+                        'role': row['role'],
+                        'current_count': row['current_count'],
+                        'limit': limit,
+                        'remaining': remaining,
+                        'can_send': remaining is None or remaining > 0
+                    }
+        finally:
+            conn.close()
+    
+    def get_user_role_summary(self) -> List[Dict[str, Any]]:
+        """Get role and today's message usage for every user in a single query"""
+        return list(self.iter_user_role_summary())
+    
     def can_send_message(self, user_id: int) -> tuple[bool, str]:
         """Check if user can send a message. Returns (can_send, reason)"""
         usage = self.get_message_usage(user_id)
@@ -662,29 +713,28 @@ class IntegratedDatabase:
         else:
             return False, f"Daily message limit reached ({usage['limit']} messages per day for guest users)"
     
-    def increment_message_count(self, user_id: int) -> bool:
-        """Increment user's message count for today"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def increment_message_count(self, user_id: int, n: int = 1, conn: sqlite3.Connection = None) -> bool:
+        """Increment user's message count for today by n in one transaction
+        
+        Pass conn to reuse an open connection; it is left open for the caller.
+        """
+        own_conn = conn is None
+        if own_conn:
+            conn = self.get_connection()
         
         today = datetime.now().date().isoformat()
         
         try:
-            # Try to insert new record
-            cursor.execute('''
-                INSERT INTO message_usage (user_id, date, message_count) 
-                VALUES (?, ?, 1)
-            ''', (user_id, today))
-        except sqlite3.IntegrityError:
-            # Record exists, update it
-            cursor.execute('''
-                UPDATE message_usage 
-                SET message_count = message_count + 1 
-                WHERE user_id = ? AND date = ?
-            ''', (user_id, today))
-        
-        conn.commit()
-        conn.close()
+            with conn:
+                # UNIQUE(user_id, date) turns repeat rows into increments
+                conn.executemany('''
+                    INSERT INTO message_usage (user_id, date, message_count)
+                    VALUES (?, ?, 1)
+                    ON CONFLICT(user_id, date) DO UPDATE SET message_count = message_count + 1
+                ''', [(user_id, today)] * n)
+        finally:
+            if own_conn:
+                conn.close()
         return True
     
     def get_all_users_stats(self) -> List[Dict[str, Any]]:
@@ -0,0 +1,9 @@
+"""
+Precomputed bcrypt hashes for the fixed passwords the repair scripts reset.
+
+Hashing at the default 12 rounds takes a noticeable fraction of a second, and
+these passwords are literals, so the hashes are computed once and stored here.
+"""
+
+# bcrypt hash of './/' (12 rounds)
+WAI_TSE_HASH = '$2b$12$7HubbxuObZZXX5wZQvFcyO8YbRWBJmaPm6UaA09T3dRTs7lRMGf6W'
@@ -2515,7 +2515,7 @@ class IntegratedAIChatbot {
             ` : '';
             
             return `
-                <div style="margin-bottom: 16px; display: flex; justify-content: ${isUser ? 'flex-end' : 'flex-start'};">
+                <div data-author="${isUser ? 'self' : 'other'}" style="margin-bottom: 16px; display: flex; justify-content: ${isUser ? 'flex-end' : 'flex-start'};">
                     <div style="max-width: 70%; padding: 12px; border-radius: 12px; background: ${isUser ? '#667eea' : '#f1f3f4'}; color: ${isUser ? 'white' : '#333'}; position: relative; padding-right: ${replyButton ? '75px' : '40px'};">
                         ${replyHtml}
                         ${msg.message ? `<div>${msg.message}</div>` : ''}
@@ -2799,7 +2799,7 @@ class IntegratedAIChatbot {
             ` : '';
             
             return `
-                <div style="margin-bottom: 16px; display: flex; justify-content: ${isAdmin ? 'flex-end' : 'flex-start'};">
+                <div data-author="${isAdmin ? 'self' : 'other'}" style="margin-bottom: 16px; display: flex; justify-content: ${isAdmin ? 'flex-end' : 'flex-start'};">
                     <div style="max-width: 70%; padding: 12px; border-radius: 12px; background: ${isAdmin ? '#667eea' : '#f1f3f4'}; color: ${isAdmin ? 'white' : '#333'}; position: relative; padding-right: ${replyButton ? '75px' : '40px'};">
                         <div style="font-size: 0.85rem; opacity: 0.8; margin-bottom: 4px;">${isAdmin ? 'You (Admin)' : username}</div>
                         ${replyHtml}
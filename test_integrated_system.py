@@ -6,31 +6,139 @@ Tests authentication, database operations, and API endpoints
 
 import requests
 import json
+import os
+import socket
 import time
 import sys
 from pathlib import Path
+from urllib.parse import urlparse
+
+import jwt
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+# JWTs from /api/auth/login keyed by (base_url, username) -> (token, exp)
+_TOKEN_CACHE = {}
+
+FIXTURE_PATH = Path(__file__).parent / "tests" / "fixtures" / "integrated_responses.json"
+# Stands in for live login tokens in recorded responses; replay never verifies it
+SCRUBBED_TOKEN = "recorded-token-scrubbed"
+
+
+def _fixture_key(method, url):
+    return f"{method.upper()} {urlparse(url).path}"
+
+
+class FixtureAdapter(BaseAdapter):
+    """Answer session requests from recorded (status, body) pairs instead of the network"""
+    
+    def __init__(self, fixture_path=FIXTURE_PATH):
+        super().__init__()
+        if not Path(fixture_path).exists():
+            sys.exit(f"❌ No recorded responses at {fixture_path}.\n"
+                     f"   Run once against a live server with --record (without MOCK_HTTP) to create them.")
+        with open(fixture_path, 'r', encoding='utf-8') as f:
+            self.responses = json.load(f)
+    
+    def send(self, request, **kwargs):
+        key = _fixture_key(request.method, request.url)
+        if key not in self.responses:
+            raise requests.exceptions.ConnectionError(f"No recorded response for {key}", request=request)
+        recorded = self.responses[key]
+        response = requests.Response()
+        response.status_code = recorded['status_code']
+        response._content = recorded['text'].encode('utf-8')
+        response.encoding = 'utf-8'
+        response.headers = CaseInsensitiveDict(recorded.get('headers', {}))
+        response.url = request.url
+        response.request = request
+        return response
+    
+    def close(self):
+        pass
 
 class IntegratedSystemTester:
-    def __init__(self, base_url="http://localhost:5000"):
+    def __init__(self, base_url="http://localhost:5000", interactive=False, record=False):
         self.base_url = base_url
         self.session = requests.Session()
+        if os.getenv("MOCK_HTTP"):
+            adapter = FixtureAdapter()
+        else:
+            self._warm_dns(base_url)
+            # No retries so transient failures surface immediately; a larger
+            # pool keeps concurrent checks from queuing on a connection.
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=32,
+                                  max_retries=Retry(total=0))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.recorded = {} if record else None
+        if record:
+            self.session.hooks['response'].append(self._record_response)
         self.auth_token = None
         self.test_results = []
+        self.interactive = interactive
+        self._log_buf = []
         
     def log_test(self, test_name, success, message=""):
         """Log test results"""
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status} {test_name}: {message}")
+        line = f"{status} {test_name}: {message}"
+        if self.interactive:
+            print(line)
+        else:
+            self._log_buf.append(line)
         self.test_results.append({
             'test': test_name,
             'success': success,
             'message': message
         })
     
+    @staticmethod
+    def _warm_dns(base_url):
+        """Resolve the server host once so later connections hit the resolver cache"""
+        host = urlparse(base_url).hostname
+        if host:
+            try:
+                socket.gethostbyname_ex(host)
+            except OSError:
+                pass
+    
+    def flush_log(self):
+        """Write buffered test lines to stdout in a single call"""
+        if self._log_buf:
+            sys.stdout.write("\n".join(self._log_buf) + "\n")
+            sys.stdout.flush()
+            self._log_buf.clear()
+    
+    def _record_response(self, response, *args, **kwargs):
+        """Session response hook used by --record"""
+        text = response.text
+        # Never write a usable bearer token into the fixture file
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and data.get('token'):
+            data['token'] = SCRUBBED_TOKEN
+            text = json.dumps(data)
+        self.recorded[_fixture_key(response.request.method, response.url)] = {
+            'status_code': response.status_code,
+            'text': text,
+            'headers': {'Content-Type': response.headers.get('Content-Type', '')}
+        }
+    
+    def save_recording(self, fixture_path=FIXTURE_PATH):
+        """Write recorded responses for later MOCK_HTTP runs"""
+        fixture_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(fixture_path, 'w', encoding='utf-8') as f:
+            json.dump(self.recorded, f, indent=2, ensure_ascii=False)
+        print(f"📼 Recorded {len(self.recorded)} responses to {fixture_path}")
+    
     def test_server_running(self):
         """Test if the Flask server is running"""
         try:
-            response = requests.get(f"{self.base_url}/", timeout=5)
+            response = self.session.get(f"{self.base_url}/", timeout=5)
             success = response.status_code == 200
             self.log_test("Server Running", success, f"Status: {response.status_code}")
             return success
@@ -41,7 +149,7 @@ class IntegratedSystemTester:
     def test_multi_user_interface(self):
         """Test if multi-user interface is accessible"""
         try:
-            response = requests.get(f"{self.base_url}/multi-user", timeout=5)
+            response = self.session.get(f"{self.base_url}/multi-user", timeout=5)
             success = response.status_code == 200 and "Multi-User" in response.text
             self.log_test("Multi-User Interface", success, f"Status: {response.status_code}")
             return success
@@ -58,18 +166,27 @@ class IntegratedSystemTester:
     
     def test_default_user_login(self):
         """Test login with default user 'Wai Tse'"""
+        username = "Wai Tse"
+        token, exp = _TOKEN_CACHE.get((self.base_url, username), (None, 0))
+        if token and time.time() < exp - 30:
+            self.auth_token = token
+            self.session.headers.update({'Authorization': f'Bearer {self.auth_token}'})
+            self.log_test("Default User Login", True, "Reused cached token for Wai Tse")
+            return True
+        
         try:
             login_data = {
-                "username": "Wai Tse",
+                "username": username,
                 "password": ".//."
             }
-            response = requests.post(f"{self.base_url}/api/auth/login", 
-                                   json=login_data, timeout=10)
+            response = self.session.post(f"{self.base_url}/api/auth/login", 
+                                         json=login_data, timeout=10)
             
             if response.status_code == 200:
                 data = response.json()
                 if data.get('success') and data.get('token'):
                     self.auth_token = data['token']
+                    self._cache_token(username, self.auth_token)
                     self.session.headers.update({'Authorization': f'Bearer {self.auth_token}'})
                     self.log_test("Default User Login", True, "Successfully logged in as Wai Tse")
                     return True
@@ -80,6 +197,15 @@ class IntegratedSystemTester:
             self.log_test("Default User Login", False, f"Error: {str(e)}")
             return False
     
+    def _cache_token(self, username, token):
+        """Remember a login token until its 'exp' claim"""
+        try:
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.PyJWTError:
+            return
+        if 'exp' in claims:
+            _TOKEN_CACHE[(self.base_url, username)] = (token, float(claims['exp']))
+    
     def test_user_profile_access(self):
         """Test accessing user profile"""
         if not self.auth_token:
@@ -195,8 +321,8 @@ class IntegratedSystemTester:
                 "email": f"test_{int(time.time())}@example.com",
                 "password": "testpassword123"
             }
-            response = requests.post(f"{self.base_url}/api/auth/signup", 
-                                   json=signup_data, timeout=10)
+            response = self.session.post(f"{self.base_url}/api/auth/signup", 
+                                         json=signup_data, timeout=10)
             success = response.status_code == 200
             if success:
                 data = response.json()
@@ -214,6 +340,7 @@ class IntegratedSystemTester:
         
         # Basic connectivity tests
         if not self.test_server_running():
+            self.flush_log()
             print("\n❌ Server is not running. Please start the Flask app first:")
             print("   cd C:\\Users\\trabc\\CascadeProjects\\ai-model-compare")
             print("   python app.py")
@@ -237,6 +364,8 @@ class IntegratedSystemTester:
         # New user tests
         self.test_new_user_signup()
         
+        self.flush_log()
+        
         # Summary
         print(f"\n📊 Test Results Summary:")
         passed = sum(1 for result in self.test_results if result['success'])
@@ -258,15 +387,23 @@ def main():
     print("=" * 50)
     
     # Check if server URL is provided
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    record = "--record" in sys.argv[1:]
+    
     base_url = "http://localhost:5000"
-    if len(sys.argv) > 1:
-        base_url = sys.argv[1]
+    if args:
+        base_url = args[0]
     
     print(f"Testing server at: {base_url}")
     print()
     
-    tester = IntegratedSystemTester(base_url)
+    if os.getenv("MOCK_HTTP"):
+        print(f"Replaying recorded responses from: {FIXTURE_PATH}")
+    
+    tester = IntegratedSystemTester(base_url, record=record)
     success = tester.run_all_tests()
+    if record:
+        tester.save_recording()
     
     if success:
         print("\n🎯 Next Steps:")
@@ -5,12 +5,31 @@ Test navbar text doesn't wrap on narrow screens
 import asyncio
 from playwright.async_api import async_playwright
 import random
+import requests
 import string
 
+BASE_URL = "http://localhost:5000"
+TEST_PASSWORD = "test123"
+
+def seed_long_username_user():
+    """Create one long-username account via the API for all viewports to log in with"""
+    random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
+    test_username = f"LongUsernameTest_{random_id}_VeryLong"
+    response = requests.post(f"{BASE_URL}/api/auth/signup", json={
+        "username": test_username,
+        "email": f"test_{random_id}@example.com",
+        "password": TEST_PASSWORD
+    }, timeout=10)
+    response.raise_for_status()
+    return test_username
+
 async def test_navbar_nowrap():
     async with async_playwright() as p:
         print("🧪 Testing Navbar No-Wrap Behavior...\n")
         
+        test_username = seed_long_username_user()
+        print(f"👤 Seeded test user: {test_username}\n")
+        
         browser = await p.chromium.launch(headless=False)
         
         # Test with different viewport sizes
@@ -28,22 +47,13 @@ async def test_navbar_nowrap():
             page = await context.new_page()
             
             # Go to app
-            await page.goto("http://localhost:5000/multi-user")
+            await page.goto(f"{BASE_URL}/multi-user")
             await page.wait_for_load_state("networkidle")
             
-            # Create test user
-            random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
-            test_username = f"LongUsernameTest_{random_id}_VeryLong"
-            test_email = f"test_{random_id}@example.com"
-            
-            await page.click("#show-signup")
-            await page.wait_for_timeout(500)
-            
-            await page.fill("#signup-username", test_username)
-            await page.fill("#signup-email", test_email)
-            await page.fill("#signup-password", "test123")
-            await page.fill("#signup-confirm-password", "test123")
-            await page.click("#signup-form button[type='submit']")
+            # Log in as the seeded user
+            await page.fill("#login-username", test_username)
+            await page.fill("#login-password", TEST_PASSWORD)
+            await page.click("#login-form button[type='submit']")
             
             await page.wait_for_timeout(3000)
             
@@ -51,8 +61,9 @@ async def test_navbar_nowrap():
             dashboard = await page.query_selector("#dashboard-screen")
             if dashboard and await dashboard.is_visible():
                 # Take screenshot
-                screenshot_name = f"test_screenshots/navbar_{viewport['width']}x{viewport['height']}.png"
-                await page.screenshot(path=screenshot_name)
+                # JPEG is much cheaper to encode than PNG and fine for a visual wrap check
+                screenshot_name = f"test_screenshots/navbar_{viewport['width']}x{viewport['height']}.jpg"
+                await page.screenshot(path=screenshot_name, type="jpeg", quality=70, full_page=False)
                 print(f"   📸 Screenshot: {screenshot_name}")
                 
                 # Check if title is visible
@@ -1,9 +1,19 @@
 import asyncio
 from ai_compare.simple_models import ChatGPTModel
 
+# ChatGPTModel keeps one OpenAI client (and its pooled HTTP connection) on
+# self.client, so reusing the model instance avoids a new TLS handshake per call.
+_MODEL = None
+
+async def get_model():
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = ChatGPTModel()
+    return _MODEL
+
 async def test():
     try:
-        model = ChatGPTModel()
+        model = await get_model()
         response = await model.get_response("What is AI?")
         print("SUCCESS:", response)
     except Exception as e:
@@ -4,113 +4,288 @@ Tests the banner, buttons, and user flow for personality assessment
 """
 
 import asyncio
-from playwright.async_api import async_playwright, Page, expect
+import contextvars
+import hashlib
+from playwright.async_api import async_playwright, Page, expect, TimeoutError as PlaywrightTimeoutError
 import os
-from datetime import datetime
-import random
-import string
+import time
+import secrets
+import sys
+
+# Logged-in browser storage saved after a successful login and reused by later runs
+AUTH_STATE_PATH = "auth.json"
+VIEWPORT = {"width": 1920, "height": 1080}
+# Common test accounts tried before falling back to signup
+_CREDENTIALS = (
+    ("admin", "admin123"),
+    ("TestUser", "test123"),
+    ("Wai Tse", "password"),
+    ("test", "test123"),
+)
+# Output buffer of the stage running in the current task (None outside run_stage)
+_stage_out = contextvars.ContextVar("stage_out", default=None)
+# Chromium profile directory reused across invocations when TEST_PERSISTENT=1
+PROFILE_DIR = ".playwright-profile"
+BROWSER_ARGS = [
+    "--disable-dev-shm-usage",
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+    "--no-sandbox",
+]
 
 class PersonalityTestTester:
     def __init__(self):
         self.base_url = "http://localhost:5000"
         self.screenshots_dir = "test_screenshots/personality_integration"
-        os.makedirs(self.screenshots_dir, exist_ok=True)
-        
+        self._dir_made = False
+        self._shot_n = 0
+        # "on_failure" (default) only keeps failure shots; "all" keeps every stage
+        self.screenshot_mode = os.getenv("TEST_SCREENSHOTS", "on_failure")
+        self._last_shot_digest = None
+        self._last_shot_path = None
+        self._locators = {}
+        self.storage_state = None
+        self.context = None
+        self._log_q = asyncio.Queue()
+        
+    def locators(self, page: Page):
+        """Return the lazily-resolved locators for a page, creating them once"""
+        if page not in self._locators:
+            self._locators[page] = {
+                "login_form": page.locator("#login-form"),
+                "dashboard": page.locator("#dashboard-screen"),
+                "signup_screen": page.locator("#signup-screen"),
+                "banner": page.locator("#personality-test-banner"),
+                "take_banner_btn": page.locator("#take-test-banner-btn"),
+                "close_banner_btn": page.locator("#close-banner-btn"),
+                "psychology_tab": page.locator("#psychology-tab"),
+                "take_test_btn": page.locator("#take-personality-test-btn"),
+            }
+        return self._locators[page]
+    
     def get_screenshot_path(self, name: str) -> str:
-        """Generate timestamped screenshot filename"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return os.path.join(self.screenshots_dir, f"{timestamp}_{name}.png")
+        """Generate a sequence-numbered screenshot filename, creating the directory on first use"""
+        if not self._dir_made:
+            os.makedirs(self.screenshots_dir, exist_ok=True)
+            self._dir_made = True
+        self._shot_n += 1
+        return os.path.join(self.screenshots_dir, f"{self._shot_n:03d}_{name}.png")
+    
+    async def _shot(self, page: Page, name: str, always: bool = False):
+        """Capture a screenshot unless screenshots are limited to failures"""
+        if self.screenshot_mode == "on_failure" and not always:
+            return
+        path = self.get_screenshot_path(name)
+        data = await page.screenshot()
+        digest = hashlib.sha256(data).hexdigest()
+        if digest == self._last_shot_digest:
+            # Identical frame to the previous shot - link to it instead of writing again
+            try:
+                os.symlink(os.path.basename(self._last_shot_path), path)
+                return
+            except OSError:
+                pass
+        with open(path, "wb") as f:
+            f.write(data)
+        self._last_shot_digest = digest
+        self._last_shot_path = path
     
     async def test_personality_integration(self):
         """Main test function"""
         async with async_playwright() as p:
             print("🚀 Starting Personality Test Integration Tests...\n")
             
-            # Launch browser
-            browser = await p.chromium.launch(headless=False, slow_mo=1000)
-            context = await browser.new_context(viewport={"width": 1920, "height": 1080})
+            # Launch browser (TEST_HEADLESS=0 TEST_SLOWMO=1000 for a watchable run)
+            headless = os.getenv("TEST_HEADLESS", "1") == "1"
+            slow_mo = int(os.getenv("TEST_SLOWMO", "0"))
+            if os.getenv("TEST_PERSISTENT") == "1":
+                # Reuse the on-disk profile (cookies, cache) from earlier runs
+                context = await p.chromium.launch_persistent_context(
+                    user_data_dir=PROFILE_DIR,
+                    headless=headless,
+                    slow_mo=slow_mo,
+                    args=BROWSER_ARGS,
+                    viewport=VIEWPORT,
+                )
+                browser = None
+            else:
+                browser = await p.chromium.launch(headless=headless, slow_mo=slow_mo, args=BROWSER_ARGS)
+                context_kwargs = {"viewport": VIEWPORT}
+                if os.path.exists(AUTH_STATE_PATH):
+                    context_kwargs["storage_state"] = AUTH_STATE_PATH
+                context = await browser.new_context(**context_kwargs)
+            self.context = context
             page = await context.new_page()
-            
-            # Capture console logs
-            page.on("console", lambda msg: print(f"      [Browser Console] {msg.type}: {msg.text}"))
-            page.on("pageerror", lambda err: print(f"      [Browser Error] {err}"))
+            self.attach_console(page)
+            log_drain = asyncio.create_task(self._drain_logs())
             
             try:
                 # Test 1: Login
                 await self.test_login(page)
+                # Stage 5 dismisses the banner; a persistent profile would keep that
+                # flag and hide the banner from stage 2 on every later run
+                await page.evaluate("() => localStorage.removeItem('personality-banner-dismissed')")
+                self.storage_state = await context.storage_state(path=AUTH_STATE_PATH)
                 
-                # Test 2: Check for banner appearance
-                await self.test_banner_appearance(page)
-                
-                # Test 3: Test banner button
-                await self.test_banner_button(page, context)
-                
-                # Test 4: Test Psychology tab button
-                await self.test_psychology_tab_button(page, context)
+                stages = [
+                    # Test 2: Check for banner appearance
+                    ("banner_appearance", lambda pg, ctx: self.test_banner_appearance(pg)),
+                    # Test 3: Test banner button
+                    ("banner_button", self.test_banner_button),
+                    # Test 4: Test Psychology tab button
+                    ("psychology_tab", self.test_psychology_tab_button),
+                    # Test 5: Test banner dismissal
+                    ("banner_dismissal", lambda pg, ctx: self.test_banner_dismissal(pg)),
+                ]
+                # Each stage buffers its lines so concurrent stages don't interleave
+                outputs = [[] for _ in stages]
+                if browser:
+                    # Tests 2-5 each run in their own pre-authenticated context
+                    results = await asyncio.gather(
+                        *(self.run_stage(browser, name, stage, out)
+                          for (name, stage), out in zip(stages, outputs)),
+                        return_exceptions=True
+                    )
+                else:
+                    # A persistent context shares localStorage between pages, so run in order
+                    results = []
+                    for (name, stage), out in zip(stages, outputs):
+                        try:
+                            results.append(await self.run_stage(None, name, stage, out))
+                        except Exception as e:
+                            results.append(e)
                 
-                # Test 5: Test banner dismissal
-                await self.test_banner_dismissal(page)
+                # Print each stage's buffered output in order
+                self._flush_logs()
+                for out in outputs:
+                    print("\n".join(out))
+                for result in results:
+                    if isinstance(result, Exception):
+                        raise result
                 
                 print("\n✅ All tests completed successfully!")
                 
             except Exception as e:
                 print(f"\n❌ Test failed: {e}")
-                await page.screenshot(path=self.get_screenshot_path("error"))
+                await self._shot(page, "error", always=True)
                 raise
             finally:
-                await browser.close()
+                log_drain.cancel()
+                await asyncio.gather(log_drain, return_exceptions=True)
+                await (browser or context).close()
+    
+    def attach_console(self, page: Page, label: str = None):
+        """Queue browser console output and page errors for the log drain task"""
+        tag = f"[{label}] " if label else ""
+        page.on("console", lambda msg: self._log_q.put_nowait(f"      {tag}[Browser Console] {msg.type}: {msg.text}"))
+        page.on("pageerror", lambda err: self._log_q.put_nowait(f"      {tag}[Browser Error] {err}"))
+    
+    def say(self, text: str = ""):
+        """Print a line, or add it to the running stage's buffer inside run_stage"""
+        out = _stage_out.get()
+        if out is None:
+            print(text)
+        else:
+            out.append(text)
+    
+    def _flush_logs(self):
+        """Write all queued browser log lines in one stdout call"""
+        lines = []
+        while not self._log_q.empty():
+            lines.append(self._log_q.get_nowait())
+        if lines:
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.stdout.flush()
+    
+    async def _drain_logs(self):
+        """Flush queued browser logs once per second until cancelled"""
+        try:
+            while True:
+                await asyncio.sleep(1)
+                self._flush_logs()
+        finally:
+            self._flush_logs()
+    
+    async def run_stage(self, browser, name, stage, out):
+        """Run one stage on a fresh page restored from the logged-in storage state, buffering its output in out"""
+        token = _stage_out.set(out)
+        if browser:
+            context = await browser.new_context(storage_state=self.storage_state, viewport=VIEWPORT)
+        else:
+            context = self.context
+        page = await context.new_page()
+        self.attach_console(page, name)
+        try:
+            await page.goto(f"{self.base_url}/multi-user", wait_until="domcontentloaded")
+            await self.locators(page)["dashboard"].wait_for(state="visible", timeout=5000)
+            await stage(page, context)
+        except Exception as e:
+            out.append(f"   ❌ Stage {name} failed: {e}")
+            await self._shot(page, f"{name}_error", always=True)
+            raise
+        finally:
+            if browser:
+                await context.close()
+            else:
+                await page.close()
+            _stage_out.reset(token)
     
     async def test_login(self, page: Page):
         """Test login functionality"""
         print("1️⃣ Testing Login...")
+        loc = self.locators(page)
         
         # Navigate to login page
-        await page.goto(f"{self.base_url}/multi-user")
-        await page.wait_for_load_state("networkidle")
+        await page.goto(f"{self.base_url}/multi-user", wait_until="domcontentloaded")
+        await page.locator("#login-form:visible, #dashboard-screen:visible").first.wait_for(timeout=5000)
         
         # Take screenshot of login page
-        await page.screenshot(path=self.get_screenshot_path("01_login_page"))
+        await self._shot(page, "login_page")
         
         # Check if we need to login or are already logged in
-        login_form = await page.query_selector("#login-form")
-        dashboard = await page.query_selector("#dashboard-screen")
-        
-        if dashboard and await dashboard.is_visible():
+        if await loc["dashboard"].is_visible():
             print("   ✅ Already logged in\n")
             return
         
-        if login_form and await login_form.is_visible():
+        if await loc["login_form"].is_visible():
             # Try to login first with common test credentials
-            credentials = [
-                ("admin", "admin123"),
-                ("TestUser", "test123"),
-                ("Wai Tse", "password"),
-                ("test", "test123")
-            ]
+            credentials = _CREDENTIALS
             
-            login_successful = False
+            # Probe all credentials at once in separate contexts; first success wins
+            print(f"   🔑 Trying {len(credentials)} credential pairs in parallel...")
+            browser = page.context.browser
+            tasks = [asyncio.create_task(self._try_credentials(browser, username, password))
+                     for username, password in credentials]
+            winner = None
+            for next_done in asyncio.as_completed(tasks):
+                winner = await next_done
+                if winner:
+                    break
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
             
-            for username, password in credentials:
-                print(f"   🔑 Trying {username}...")
-                await page.fill("#login-username", username)
-                await page.fill("#login-password", password)
-                
-                await page.screenshot(path=self.get_screenshot_path(f"02_login_{username}"))
-                
-                # Click login button
-                await page.click("button[type='submit']")
-                
-                # Wait a bit
-                await page.wait_for_timeout(2000)
-                
-                # Check if dashboard appeared
-                dashboard = await page.query_selector("#dashboard-screen")
-                if dashboard and await dashboard.is_visible():
+            login_successful = False
+            if winner:
+                # Restore the winning probe's session instead of logging in again
+                username, state = winner
+                if state:
+                    await page.context.add_cookies(state["cookies"])
+                    for origin in state["origins"]:
+                        if origin["origin"] == self.base_url:
+                            await page.evaluate(
+                                "items => items.forEach(({name, value}) => localStorage.setItem(name, value))",
+                                origin["localStorage"]
+                            )
+                await page.reload(wait_until="domcontentloaded")
+                try:
+                    await loc["dashboard"].wait_for(state="visible", timeout=5000)
+                    await self._shot(page, f"login_{username}")
                     print(f"   ✅ Login successful with {username}\n")
                     login_successful = True
-                    break
-                else:
-                    print(f"   ❌ Login failed for {username}")
+                except PlaywrightTimeoutError:
+                    print(f"   ❌ Restored session for {username} did not reach the dashboard")
             
             if not login_successful:
                 print("   ⚠️  All login attempts failed!")
@@ -118,7 +293,7 @@ class PersonalityTestTester:
                 
                 # Go to signup
                 await page.click("#show-signup")
-                await page.wait_for_timeout(1000)
+                await loc["signup_screen"].wait_for(state="visible")
                 
                 # Try to create account with retries in case of duplicates
                 signup_success = False
@@ -126,7 +301,7 @@ class PersonalityTestTester:
                 
                 for attempt in range(max_retries):
                     # Generate unique username with random string
-                    random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
+                    random_id = secrets.token_hex(4)
                     test_username = f"TestUser_{random_id}"
                     test_email = f"test_{random_id}@example.com"
                     
@@ -138,47 +313,68 @@ class PersonalityTestTester:
                     await page.fill("#signup-password", "test123")
                     await page.fill("#signup-confirm-password", "test123")
                     
-                    await page.screenshot(path=self.get_screenshot_path(f"02_signup_filled_attempt{attempt + 1}"))
+                    await self._shot(page, f"signup_filled_attempt{attempt + 1}")
                     
                     # Submit signup
                     await page.click("#signup-form button[type='submit']")
                     
-                    # Wait for response
-                    await page.wait_for_timeout(2000)
-                    
                     # Check if we're on dashboard (signup successful)
-                    dashboard = await page.query_selector("#dashboard-screen")
-                    if dashboard and await dashboard.is_visible():
+                    try:
+                        await loc["dashboard"].wait_for(state="visible", timeout=5000)
                         signup_success = True
                         print(f"   ✅ Account created successfully: {test_username}")
                         break
-                    else:
+                    except PlaywrightTimeoutError:
                         # Signup failed, check for error message
                         print(f"   ⚠️  Signup failed for {test_username}, retrying...")
                         # Go back to signup screen if needed
-                        signup_screen = await page.query_selector("#signup-screen")
-                        if not signup_screen or not await signup_screen.is_visible():
+                        if not await loc["signup_screen"].is_visible():
                             await page.click("#show-signup")
-                            await page.wait_for_timeout(500)
+                            await loc["signup_screen"].wait_for(state="visible")
                 
                 if not signup_success:
                     raise Exception("Failed to create account after multiple attempts")
         
         # Final check
-        dashboard = await page.query_selector("#dashboard-screen")
-        if dashboard and await dashboard.is_visible():
-            await page.screenshot(path=self.get_screenshot_path("03_dashboard_loaded"))
+        if await loc["dashboard"].is_visible():
+            await self._shot(page, "dashboard_loaded")
             print("   ✅ Successfully logged in\n")
         else:
-            await page.screenshot(path=self.get_screenshot_path("03_login_failed"))
+            await self._shot(page, "login_failed", always=True)
             raise Exception("Login failed - dashboard not visible")
     
+    async def _try_credentials(self, browser, username: str, password: str):
+        """Attempt a login in a throwaway context.
+        
+        Returns (username, storage_state) if the dashboard shows, else None. The
+        state is None for a persistent context, whose pages already share the login.
+        """
+        # Persistent contexts have no browser handle, so probe in a page of the shared context
+        context = await browser.new_context() if browser else None
+        page = await (context or self.context).new_page()
+        try:
+            await page.goto(f"{self.base_url}/multi-user", wait_until="domcontentloaded")
+            await page.fill("#login-username", username)
+            await page.fill("#login-password", password)
+            await page.click("button[type='submit']")
+            await page.wait_for_selector("#dashboard-screen", state="visible", timeout=5000)
+            return username, (await context.storage_state() if context else None)
+        except PlaywrightTimeoutError:
+            print(f"   ❌ Login failed for {username}")
+            return None
+        finally:
+            if context:
+                await context.close()
+            else:
+                await page.close()
+    
     async def test_banner_appearance(self, page: Page):
         """Test if personality test banner appears"""
-        print("2️⃣ Testing Banner Appearance...")
+        self.say("2️⃣ Testing Banner Appearance...")
+        loc = self.locators(page)
         
         # First check if user actually has traits
-        print("   🔍 Checking user's psychology traits...")
+        self.say("   🔍 Checking user's psychology traits...")
         traits_data = await page.evaluate("""
             async () => {
                 const response = await fetch('/api/user/psychology-traits', {
@@ -188,213 +384,265 @@ class PersonalityTestTester:
             }
         """)
         
-        print(f"   📊 User has {len(traits_data) if traits_data else 0} traits")
+        self.say(f"   📊 User has {len(traits_data) if traits_data else 0} traits")
         if traits_data and len(traits_data) > 0:
-            print(f"      Traits: {[t.get('trait_name', 'unknown') for t in traits_data[:3]]}")
+            self.say(f"      Traits: {[t.get('trait_name', 'unknown') for t in traits_data[:3]]}")
         
-        # Wait for banner to appear - poll for up to 5 seconds
-        print("   ⏳ Polling for banner (up to 5 seconds)...")
-        banner = await page.query_selector("#personality-test-banner")
+        # Wait for banner to appear - up to 5 seconds
+        self.say("   ⏳ Waiting for banner (up to 5 seconds)...")
+        banner = loc["banner"]
         
-        if not banner:
-            print("   ❌ Banner element not found in DOM!")
-            print()
+        if await banner.count() == 0:
+            self.say("   ❌ Banner element not found in DOM!")
+            self.say()
             return
         
-        # Poll for visibility
-        banner_appeared = False
-        for i in range(10):  # Check every 500ms for 5 seconds
-            is_visible = await banner.is_visible()
-            if is_visible:
-                banner_appeared = True
-                print(f"   ✅ Banner appeared after ~{(i + 1) * 0.5} seconds!")
-                break
-            await page.wait_for_timeout(500)
+        banner_appeared = await self._wait_until_visible(banner, timeout=5000)
         
         if banner_appeared:
-            await page.screenshot(path=self.get_screenshot_path("04_banner_visible"))
+            await self._shot(page, "banner_visible")
             
-            # Check banner content
-            banner_text = await page.inner_text(".banner-text")
-            if "understand you better" in banner_text.lower():
-                print("   ✅ Banner has correct text")
+            # Check banner content, icon and buttons in one round-trip
+            snap = await self.snapshot_banner_state(page)
+            if snap['textOk']:
+                self.say("   ✅ Banner has correct text")
             else:
-                print(f"   ⚠️  Banner text unexpected: {banner_text}")
+                self.say(f"   ⚠️  Banner text unexpected: {snap['text']}")
             
-            # Check for brain icon
-            brain_icon = await page.query_selector(".banner-content i.fa-brain")
-            if brain_icon:
-                print("   ✅ Brain icon present")
+            if snap['hasBrain']:
+                self.say("   ✅ Brain icon present")
             
-            # Check for buttons
-            take_test_btn = await page.query_selector("#take-test-banner-btn")
-            close_btn = await page.query_selector("#close-banner-btn")
-            if take_test_btn and close_btn:
-                print("   ✅ Both buttons present (Take Test & Close)")
+            if snap['hasTakeBtn'] and snap['hasCloseBtn']:
+                self.say("   ✅ Both buttons present (Take Test & Close)")
         else:
-            print("   ⚠️  Banner did not appear within 5 seconds")
-            print("      This is normal if user already has psychology traits")
-            await page.screenshot(path=self.get_screenshot_path("04_banner_not_shown"))
+            self.say("   ⚠️  Banner did not appear within 5 seconds")
+            self.say("      This is normal if user already has psychology traits")
+            await self._shot(page, "banner_not_shown")
         
-        print()
+        self.say()
+    
+    async def snapshot_banner_state(self, page: Page):
+        """Read banner visibility, text, icon and buttons with a single evaluate call"""
+        return await page.evaluate("""() => {
+            const b = document.querySelector('#personality-test-banner');
+            if (!b) return null;
+            return {
+                visible: b.offsetParent !== null,
+                text: (b.querySelector('.banner-text')?.innerText || '').toLowerCase(),
+                textOk: (b.querySelector('.banner-text')?.innerText || '').toLowerCase().includes('understand you better'),
+                hasBrain: !!b.querySelector('.banner-content i.fa-brain'),
+                hasTakeBtn: !!document.querySelector('#take-test-banner-btn'),
+                hasCloseBtn: !!document.querySelector('#close-banner-btn')
+            };
+        }""")
+    
+    async def _wait_until_visible(self, locator, timeout: int) -> bool:
+        """Wait for a locator to become visible, reporting how long it took"""
+        start = time.monotonic()
+        try:
+            await locator.wait_for(state="visible", timeout=timeout)
+        except PlaywrightTimeoutError:
+            return False
+        self.say(f"   ✅ Banner appeared after ~{time.monotonic() - start:.1f} seconds!")
+        return True
     
     async def test_banner_button(self, page: Page, context):
         """Test banner 'Take Test Now' button"""
-        print("3️⃣ Testing Banner Button...")
-        
-        # Check if banner is visible
-        banner = await page.query_selector("#personality-test-banner")
-        if not banner or not await banner.is_visible():
-            print("   ⏭️  Skipped (banner not visible)\n")
+        self.say("3️⃣ Testing Banner Button...")
+        loc = self.locators(page)
+        
+        # This stage runs on its own fresh page, so give the banner its 2s delay to show
+        banner = loc["banner"]
+        try:
+            await banner.wait_for(state="visible", timeout=5000)
+        except PlaywrightTimeoutError:
+            self.say("   ⏭️  Skipped (banner not visible)\n")
             return
         
-        # Listen for new page (popup)
-        async with context.expect_page() as new_page_info:
-            await page.click("#take-test-banner-btn")
-            print("   ⏳ Clicked 'Take Test Now', waiting for popup...")
-        
-        new_page = await new_page_info.value
-        await new_page.wait_for_load_state("networkidle")
+        # Open the popup while listening for the new page
+        self.say("   ⏳ Clicking 'Take Test Now', waiting for popup...")
+        new_page, _ = await asyncio.gather(
+            context.wait_for_event("page", timeout=5000),
+            loc["take_banner_btn"].click()
+        )
+        try:
+            await new_page.wait_for_url("**/personality-test*", timeout=3000)
+        except PlaywrightTimeoutError:
+            pass
         
         # Check if personality test page opened
         url = new_page.url
         if "/personality-test" in url:
-            print(f"   ✅ Personality test opened: {url}")
-            await new_page.screenshot(path=self.get_screenshot_path("05_test_page_opened"))
+            self.say(f"   ✅ Personality test opened: {url}")
+            await self._shot(new_page, "test_page_opened")
             await new_page.close()
         else:
-            print(f"   ❌ Wrong page opened: {url}")
+            self.say(f"   ❌ Wrong page opened: {url}")
         
         # Check if banner is hidden
-        await page.wait_for_timeout(500)
-        banner_still_visible = await banner.is_visible()
+        try:
+            await banner.wait_for(state="hidden", timeout=2000)
+            banner_still_visible = False
+        except PlaywrightTimeoutError:
+            banner_still_visible = True
         if not banner_still_visible:
-            print("   ✅ Banner hidden after clicking")
+            self.say("   ✅ Banner hidden after clicking")
         else:
-            print("   ⚠️  Banner still visible")
+            self.say("   ⚠️  Banner still visible")
         
-        await page.screenshot(path=self.get_screenshot_path("06_after_banner_click"))
-        print()
+        await self._shot(page, "after_banner_click")
+        self.say()
     
     async def test_psychology_tab_button(self, page: Page, context):
         """Test Psychology tab 'Take Personality Test' button"""
-        print("4️⃣ Testing Psychology Tab Button...")
+        self.say("4️⃣ Testing Psychology Tab Button...")
+        loc = self.locators(page)
         
         # Navigate to Psychology tab
         await page.click("button[data-tab='psychology']")
-        await page.wait_for_timeout(500)
+        await loc["psychology_tab"].wait_for(state="visible")
         
         # Check if Psychology tab is active
-        await page.screenshot(path=self.get_screenshot_path("07_psychology_tab"))
-        
-        # Check if button exists
-        button = await page.query_selector("#take-personality-test-btn")
-        if not button:
-            print("   ❌ 'Take Personality Test' button not found!")
+        await self._shot(page, "psychology_tab")
+        
+        # Check button existence and text in one round-trip
+        button = loc["take_test_btn"]
+        button_state = await page.evaluate("""() => {
+            const btn = document.querySelector('#take-personality-test-btn');
+            if (!btn) return null;
+            return {
+                text: btn.innerText.trim(),
+                btnOk: btn.innerText.toLowerCase().includes('personality test')
+            };
+        }""")
+        if button_state is None:
+            self.say("   ❌ 'Take Personality Test' button not found!")
             return
         
-        print("   ✅ Button found in Psychology tab")
+        self.say("   ✅ Button found in Psychology tab")
         
-        # Check button text
-        button_text = await button.inner_text()
-        if "personality test" in button_text.lower():
-            print(f"   ✅ Button text correct: '{button_text.strip()}'")
+        if button_state['btnOk']:
+            self.say(f"   ✅ Button text correct: '{button_state['text']}'")
         
-        # Listen for new page
-        async with context.expect_page() as new_page_info:
-            await button.click()
-            print("   ⏳ Clicked button, waiting for popup...")
-        
-        new_page = await new_page_info.value
-        await new_page.wait_for_load_state("networkidle")
+        # Open the popup while listening for the new page
+        self.say("   ⏳ Clicking button, waiting for popup...")
+        new_page, _ = await asyncio.gather(
+            context.wait_for_event("page", timeout=5000),
+            button.click()
+        )
+        try:
+            await new_page.wait_for_url("**/personality-test*", timeout=3000)
+        except PlaywrightTimeoutError:
+            pass
         
         # Verify correct page opened
         url = new_page.url
         if "/personality-test" in url:
-            print(f"   ✅ Test opened from Psychology tab: {url}")
-            await new_page.screenshot(path=self.get_screenshot_path("08_test_from_psych_tab"))
+            self.say(f"   ✅ Test opened from Psychology tab: {url}")
+            await self._shot(new_page, "test_from_psych_tab")
             await new_page.close()
         else:
-            print(f"   ❌ Wrong page: {url}")
+            self.say(f"   ❌ Wrong page: {url}")
         
-        await page.screenshot(path=self.get_screenshot_path("09_after_psych_button"))
-        print()
+        await self._shot(page, "after_psych_button")
+        self.say()
     
     async def test_banner_dismissal(self, page: Page):
         """Test banner dismissal and localStorage"""
-        print("5️⃣ Testing Banner Dismissal...")
+        self.say("5️⃣ Testing Banner Dismissal...")
+        loc = self.locators(page)
         
         # Clear any previous dismissal flag
         await page.evaluate("() => localStorage.removeItem('personality-banner-dismissed')")
-        print("   🧹 Cleared previous dismissal flag")
+        self.say("   🧹 Cleared previous dismissal flag")
         
         # Go back to chat tab
         await page.click("button[data-tab='chat']")
-        await page.wait_for_timeout(500)
         
         # Reload the page
-        print("   ⏳ Reloading page to test banner appearance...")
-        await page.reload()
-        await page.wait_for_load_state("networkidle")
-        
-        # Poll for banner appearance
-        banner = await page.query_selector("#personality-test-banner")
-        banner_appeared = False
-        
-        print("   ⏳ Waiting for banner to appear...")
-        for i in range(10):
-            if await banner.is_visible():
-                banner_appeared = True
-                print(f"   ✅ Banner appeared after ~{(i + 1) * 0.5} seconds")
-                break
-            await page.wait_for_timeout(500)
+        self.say("   ⏳ Reloading page to test banner appearance...")
+        await page.reload(wait_until="domcontentloaded")
+        await loc["dashboard"].wait_for(state="visible", timeout=5000)
+        
+        # Wait for banner appearance
+        banner = loc["banner"]
+        
+        self.say("   ⏳ Waiting for banner to appear...")
+        banner_appeared = await self._wait_until_visible(banner, timeout=5000)
         
         if banner_appeared:
-            await page.screenshot(path=self.get_screenshot_path("10_banner_before_dismiss"))
+            await self._shot(page, "banner_before_dismiss")
             
             # Click close button
-            print("   🖱️  Clicking close button...")
-            await page.click("#close-banner-btn")
-            await page.wait_for_timeout(500)
+            self.say("   🖱️  Clicking close button...")
+            await loc["close_banner_btn"].click()
             
             # Check if banner is hidden
-            if not await banner.is_visible():
-                print("   ✅ Banner hidden after clicking X")
-                await page.screenshot(path=self.get_screenshot_path("11_banner_dismissed"))
+            try:
+                await banner.wait_for(state="hidden", timeout=2000)
+                banner_hidden = True
+            except PlaywrightTimeoutError:
+                banner_hidden = False
+            if banner_hidden:
+                self.say("   ✅ Banner hidden after clicking X")
+                await self._shot(page, "banner_dismissed")
                 
                 # Check localStorage
                 dismissed = await page.evaluate("() => localStorage.getItem('personality-banner-dismissed')")
                 if dismissed == 'true':
-                    print(f"   ✅ localStorage correctly set to: '{dismissed}'")
+                    self.say(f"   ✅ localStorage correctly set to: '{dismissed}'")
                 else:
-                    print(f"   ⚠️  localStorage value unexpected: '{dismissed}'")
+                    self.say(f"   ⚠️  localStorage value unexpected: '{dismissed}'")
                 
                 # Reload again to verify it doesn't show
-                print("   ⏳ Reloading to verify banner stays hidden...")
-                await page.reload()
-                await page.wait_for_load_state("networkidle")
+                self.say("   ⏳ Reloading to verify banner stays hidden...")
+                # The page logs its banner decision, so wait for that instead of sleeping
+                # (the timeout is raised when the async with block exits, so it sits inside the try)
+                try:
+                    async with page.expect_console_message(
+                        lambda msg: "Personality Banner:" in msg.text, timeout=10000
+                    ) as decision_info:
+                        await page.reload(wait_until="domcontentloaded")
+                    decision = (await decision_info.value).text
+                except PlaywrightTimeoutError:
+                    decision = ""
                 
-                # Wait and check if banner appears (it shouldn't)
-                await page.wait_for_timeout(3500)
-                banner_visible = await banner.is_visible()
+                # Only a "Showing after 2 seconds" decision (or none at all) can bring the banner back
+                banner_visible = False
+                if not decision or "Showing" in decision:
+                    banner_visible = await self._wait_until_visible(banner, timeout=3500)
                 
                 if not banner_visible:
-                    print("   ✅ Banner correctly stays hidden after dismissal")
-                    await page.screenshot(path=self.get_screenshot_path("12_banner_stays_hidden"))
+                    self.say("   ✅ Banner correctly stays hidden after dismissal")
+                    await self._shot(page, "banner_stays_hidden")
                 else:
-                    print("   ❌ Banner appeared again (should stay hidden)")
-                    await page.screenshot(path=self.get_screenshot_path("12_banner_reappeared_ERROR"))
+                    self.say("   ❌ Banner appeared again (should stay hidden)")
+                    await self._shot(page, "banner_reappeared_ERROR", always=True)
             else:
-                print("   ⚠️  Banner still visible after clicking close button")
+                self.say("   ⚠️  Banner still visible after clicking close button")
         else:
-            print("   ⏭️  Banner did not appear (user likely has psychology traits)")
-            print("      Skipping dismissal test")
+            self.say("   ⏭️  Banner did not appear (user likely has psychology traits)")
+            self.say("      Skipping dismissal test")
         
-        await page.screenshot(path=self.get_screenshot_path("13_final_state"))
-        print()
+        await self._shot(page, "final_state")
+        self.say()
+
+async def probe_server(host: str = "localhost", port: int = 5000):
+    """Check the server accepts TCP connections without issuing an HTTP request"""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.close()
+    await writer.wait_closed()
 
 async def main():
     """Run all tests"""
+    # Check if server is running
+    try:
+        await asyncio.wait_for(probe_server(), timeout=1.0)
+        print("✅ Server is running\n")
+    except Exception as e:
+        print(f"⚠️  Warning: Could not verify server (but continuing anyway)")
+        print(f"   Error: {e}\n")
+    
     tester = PersonalityTestTester()
     await tester.test_personality_integration()
 
@@ -404,17 +652,9 @@ if __name__ == "__main__":
     print("=" * 70)
     print()
     
-    # Check if server is running
-    try:
-        import requests
-        response = requests.get("http://localhost:5000", timeout=5)
-        print("✅ Server is running\n")
-    except Exception as e:
-        print(f"⚠️  Warning: Could not verify server (but continuing anyway)")
-        print(f"   Error: {e}\n")
-    
     asyncio.run(main())
     
     print("=" * 70)
     print("📸 Screenshots saved to: test_screenshots/personality_integration/")
+    print("   (set TEST_SCREENSHOTS=all to keep passing-stage screenshots too)")
     print("=" * 70)
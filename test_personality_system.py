@@ -10,6 +10,24 @@ from pathlib import Path
 # Add project to path
 sys.path.insert(0, str(Path(__file__).parent))
 
+# Reused across runs in the same process so the question bank is only built once
+_profiler_singleton = None
+_assessment_ui_singleton = None
+
+def _get_profiler():
+    global _profiler_singleton
+    if _profiler_singleton is None:
+        from ai_compare.personality_profiler import PersonalityProfiler
+        _profiler_singleton = PersonalityProfiler()
+    return _profiler_singleton
+
+def _get_assessment_ui():
+    global _assessment_ui_singleton
+    if _assessment_ui_singleton is None:
+        from ai_compare.personality_ui import PersonalityAssessmentUI
+        _assessment_ui_singleton = PersonalityAssessmentUI(_get_profiler())
+    return _assessment_ui_singleton
+
 async def test_personality_system():
     """Test the complete personality system workflow"""
     
@@ -19,13 +37,8 @@ async def test_personality_system():
     print("1. Initializing System Components...")
     
     try:
-        from ai_compare.personality_profiler import PersonalityProfiler
-        from ai_compare.adaptive_personality import AdaptivePersonality
-        from ai_compare.personality_ui import PersonalityFeedbackWindow, PersonalityAssessmentUI
-        from ai_compare.chatbot import AIChatbot
-        
-        profiler = PersonalityProfiler()
-        assessment_ui = PersonalityAssessmentUI(profiler)
+        profiler = _get_profiler()
+        assessment_ui = _get_assessment_ui()
         print("   ✓ All components initialized successfully")
         
     except Exception as e:
@@ -38,6 +51,10 @@ async def test_personality_system():
     test_user_id = "test_user_123"
     
     try:
+        # Drop any session left over from an earlier run with the shared profiler
+        profiler.assessment_sessions.pop(test_user_id, None)
+        assessment_ui.current_sessions.pop(test_user_id, None)
+        
         # Start assessment
         intro_ui = assessment_ui.start_assessment_ui(test_user_id)
         print(f"   ✓ Assessment started: {intro_ui['title']}")
@@ -64,18 +81,20 @@ async def test_personality_system():
             (2, "High conscientiousness")
         ]
         
-        for i, (option_id, description) in enumerate(test_responses):
-            question_ui = assessment_ui.get_current_question_ui(test_user_id)
-            if question_ui and question_ui.get('ui_type') == 'assessment_question':
-                question_id = question_ui['question_id']
-                result = assessment_ui.process_question_response(test_user_id, question_id, option_id)
-                print(f"   ✓ Response {i+1} recorded: {description}")
-            else:
-                break
+        # Submit all answers in one call against the remaining session questions
+        session = assessment_ui.current_sessions[test_user_id]
+        remaining = session['questions'][session['current_question']:]
+        answers = [(question.question_id, option_id)
+                   for question, (option_id, _) in zip(remaining, test_responses)]
+        final_ui = assessment_ui.bulk_answer(test_user_id, answers)
+        
+        if 'error' in final_ui:
+            raise RuntimeError(final_ui['error'])
+        for i, (_, description) in enumerate(test_responses[:len(answers)]):
+            print(f"   ✓ Response {i+1} recorded: {description}")
         
         # Check if assessment is complete
-        final_ui = assessment_ui.get_current_question_ui(test_user_id)
-        if final_ui and final_ui.get('ui_type') == 'assessment_complete':
+        if final_ui.get('ui_type') == 'assessment_complete':
             print("   ✓ Assessment completed successfully")
             profile_summary = final_ui.get('profile_summary', {})
             print(f"   ✓ Profile created: {profile_summary}")
@@ -84,8 +103,27 @@ async def test_personality_system():
         print(f"   ✗ Response simulation failed: {e}")
         return False
     
-    # Test 4: Test adaptive personality
-    print("\n4. Testing Adaptive Personality System...")
+    # Test 4 rewrites the user's profile file, which Tests 5 and 6 then load,
+    # so it runs first; 5 and 6 only read it and can run side by side
+    results = [await asyncio.to_thread(_test_adaptive, profiler, test_user_id)]
+    results += await asyncio.gather(
+        asyncio.to_thread(_test_feedback, profiler, test_user_id),
+        asyncio.to_thread(_test_chatbot, test_user_id)
+    )
+    
+    # Print each test's buffered output in order
+    success = True
+    for ok, lines in results:
+        print("\n".join(lines))
+        success = success and ok
+    
+    return success
+
+def _test_adaptive(profiler, test_user_id):
+    """Test 4: adaptive personality; returns (success, output lines)"""
+    from ai_compare.adaptive_personality import AdaptivePersonality
+    
+    out = ["\n4. Testing Adaptive Personality System..."]
     
     try:
         adaptive_personality = AdaptivePersonality(test_user_id, profiler)
@@ -94,68 +132,78 @@ async def test_personality_system():
         test_message = "I need help with a complex programming problem. Can you explain it step by step?"
         analysis = adaptive_personality.analyze_user_message(test_message)
         
-        print(f"   ✓ Message analysis completed")
-        print(f"     - Message length: {analysis.message_length_avg} words")
-        print(f"     - Question frequency: {analysis.question_frequency:.2f}")
-        print(f"     - Technical language: {analysis.technical_language_usage:.2f}")
+        out.append(f"   ✓ Message analysis completed")
+        out.append(f"     - Message length: {analysis.message_length_avg} words")
+        out.append(f"     - Question frequency: {analysis.question_frequency:.2f}")
+        out.append(f"     - Technical language: {analysis.technical_language_usage:.2f}")
         
         # Test response adaptation
         base_response = "Here's how to solve your programming problem. First, understand the requirements."
         adapted_response = adaptive_personality.adapt_response_style(test_message, base_response)
         
-        print(f"   ✓ Response adaptation completed")
-        print(f"     - Original: {base_response[:50]}...")
-        print(f"     - Adapted: {adapted_response[:50]}...")
+        out.append(f"   ✓ Response adaptation completed")
+        out.append(f"     - Original: {base_response[:50]}...")
+        out.append(f"     - Adapted: {adapted_response[:50]}...")
         
     except Exception as e:
-        print(f"   ✗ Adaptive personality test failed: {e}")
-        return False
+        out.append(f"   ✗ Adaptive personality test failed: {e}")
+        return False, out
+    
+    return True, out
+
+def _test_feedback(profiler, test_user_id):
+    """Test 5: feedback system; returns (success, output lines)"""
+    from ai_compare.personality_ui import PersonalityFeedbackWindow
     
-    # Test 5: Test feedback system
-    print("\n5. Testing Feedback System...")
+    out = ["\n5. Testing Feedback System..."]
     
     try:
         feedback_window = PersonalityFeedbackWindow(test_user_id, profiler)
         feedback = feedback_window.get_current_feedback()
         
-        print(f"   ✓ Feedback generated successfully")
-        print(f"     - Profile status: {feedback['profile_data']['status']}")
-        print(f"     - Confidence: {feedback['profile_data']['confidence']:.0%}")
+        out.append(f"   ✓ Feedback generated successfully")
+        out.append(f"     - Profile status: {feedback['profile_data']['status']}")
+        out.append(f"     - Confidence: {feedback['profile_data']['confidence']:.0%}")
         
         visual_indicators = feedback['visual_indicators']
-        print(f"     - Confidence bar: {visual_indicators['confidence_bar']['label']}")
+        out.append(f"     - Confidence bar: {visual_indicators['confidence_bar']['label']}")
         
         if visual_indicators['trait_indicators']:
-            print("     - Detected traits:")
+            out.append("     - Detected traits:")
             for trait, info in visual_indicators['trait_indicators'].items():
-                print(f"       * {info['display_name']}: {info['value']}")
+                out.append(f"       * {info['display_name']}: {info['value']}")
         
     except Exception as e:
-        print(f"   ✗ Feedback system test failed: {e}")
-        return False
+        out.append(f"   ✗ Feedback system test failed: {e}")
+        return False, out
+    
+    return True, out
+
+def _test_chatbot(test_user_id):
+    """Test 6: chatbot integration; returns (success, output lines)"""
+    from ai_compare.chatbot import AIChatbot
     
-    # Test 6: Test chatbot integration
-    print("\n6. Testing Chatbot Integration...")
+    out = ["\n6. Testing Chatbot Integration..."]
     
     try:
         chatbot = AIChatbot(session_id=test_user_id)
         
         # Check if assessment is suggested
         should_offer = chatbot.should_offer_assessment()
-        print(f"   ✓ Assessment suggestion check: {should_offer}")
+        out.append(f"   ✓ Assessment suggestion check: {should_offer}")
         
         # Get personality feedback
         personality_feedback = chatbot.get_personality_feedback()
-        print(f"   ✓ Personality feedback retrieved: {personality_feedback['status']}")
+        out.append(f"   ✓ Personality feedback retrieved: {personality_feedback['status']}")
         
         # Test a simple chat interaction (without actually calling AI models)
-        print("   ✓ Chatbot integration successful")
+        out.append("   ✓ Chatbot integration successful")
         
     except Exception as e:
-        print(f"   ✗ Chatbot integration test failed: {e}")
-        return False
+        out.append(f"   ✗ Chatbot integration test failed: {e}")
+        return False, out
     
-    return True
+    return True, out
 
 def demonstrate_usage():
     """Demonstrate how to use the personality system"""
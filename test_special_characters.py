@@ -3,12 +3,39 @@
 Test password authentication with various special characters to identify the issue
 """
 
+import asyncio
+import os
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
 import bcrypt
 from integrated_database import IntegratedDatabase
-import requests
 
-def test_password_characters():
+API_BASE_URL = 'http://localhost:5000'
+API_MAX_CONNECTIONS = 4
+
+async def api_login_all(pairs):
+    """POST every (username, password) pair to /api/auth/login concurrently.
+
+    Returns one status code per pair, or the exception raised for it.
+    """
+    timeout = aiohttp.ClientTimeout(total=5)
+    # A small keep-alive pool: the batch reuses a few sockets instead of opening one per login
+    connector = aiohttp.TCPConnector(limit_per_host=API_MAX_CONNECTIONS, keepalive_timeout=30)
+    async with aiohttp.ClientSession(API_BASE_URL, timeout=timeout, connector=connector) as session:
+        async def login(username, password):
+            async with session.post('/api/auth/login',
+                                    json={'username': username, 'password': password}) as response:
+                return response.status
+        
+        return await asyncio.gather(*(login(u, p) for u, p in pairs), return_exceptions=True)
+
+def hash_password(password):
+    """bcrypt-hash one password; bcrypt releases the GIL so this parallelizes on threads"""
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def check_password_characters():
+    """Try each special-character password via DB and API auth; returns the failing ones"""
     print("🔍 Testing Password Special Characters")
     print("=" * 50)
     
@@ -30,62 +57,75 @@ def test_password_characters():
         "user.name",     # Common pattern with period
     ]
     
-    conn = sqlite3.connect('integrated_users.db')
-    cursor = conn.cursor()
+    usernames = [f'TestUser_{i}' for i in range(len(test_passwords))]
+    pairs = list(zip(usernames, test_passwords))
     
     working_passwords = []
     failing_passwords = []
     
-    for i, password in enumerate(test_passwords):
-        print(f"\n--- Test {i+1}: '{password}' (length: {len(password)}) ---")
-        
-        try:
-            # Delete existing user
-            cursor.execute('DELETE FROM users WHERE username = ?', ('TestUser',))
-            
-            # Create user with test password
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            cursor.execute('''
+    # Create one user per password up front so the API logins can run concurrently
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        hashes = list(pool.map(hash_password, test_passwords))
+    
+    # Matching on email too clears leftovers that would hit its unique constraint
+    cleanup_keys = [(u, f'test_{i}@example.com') for i, u in enumerate(usernames)]
+    
+    # Creates the schema on a fresh checkout before the setup batch touches users
+    db = IntegratedDatabase()
+    conn = sqlite3.connect(db.db_path)
+    try:
+        # `with conn` runs the DELETE and INSERT batches as one transaction
+        with conn:
+            conn.executemany('DELETE FROM users WHERE username = ? OR email = ?', cleanup_keys)
+            conn.executemany('''
                 INSERT INTO users (username, email, password_hash)
                 VALUES (?, ?, ?)
-            ''', ('TestUser', 'test@example.com', password_hash))
-            conn.commit()
-            
-            # Test 1: Direct database authentication
-            db = IntegratedDatabase()
-            user = db.authenticate_user('TestUser', password)
-            db_result = "✅ SUCCESS" if user else "❌ FAILED"
-            print(f"   Database auth: {db_result}")
-            
-            # Test 2: API authentication
-            try:
-                response = requests.post('http://localhost:5000/api/auth/login', 
-                                       json={'username': 'TestUser', 'password': password}, 
-                                       timeout=5)
-                api_result = "✅ SUCCESS" if response.status_code == 200 else f"❌ FAILED ({response.status_code})"
-                print(f"   API auth: {api_result}")
-                
-                if user and response.status_code == 200:
-                    working_passwords.append(password)
-                    print(f"   ✅ BOTH WORK")
-                else:
-                    failing_passwords.append(password)
-                    if user and response.status_code != 200:
-                        print(f"   ⚠️  DB works but API fails - possible encoding issue")
-                    elif not user and response.status_code == 200:
-                        print(f"   ⚠️  API works but DB fails - unexpected")
-                    else:
-                        print(f"   ❌ BOTH FAIL")
-                        
-            except Exception as e:
-                print(f"   API auth: ❌ ERROR ({e})")
-                failing_passwords.append(password)
-                
-        except Exception as e:
-            print(f"   Setup error: {e}")
-            failing_passwords.append(password)
+            ''', [
+                (username, f'test_{i}@example.com', hashes[i])
+                for i, username in enumerate(usernames)
+            ])
+    except Exception as e:
+        print(f"\n   Setup error: {e}")
+        failing_passwords.extend(test_passwords)
+        pairs = []
     
-    conn.close()
+    try:
+        # Test 1: Direct database authentication for every password
+        db_users = [db.authenticate_user(username, password) for username, password in pairs]
+        
+        # Test 2: API authentication, only where DB auth passed - the API would fail the same way otherwise
+        api_pairs = [pair for pair, user in zip(pairs, db_users) if user]
+        api_results = dict(zip(api_pairs, asyncio.run(api_login_all(api_pairs)))) if api_pairs else {}
+    finally:
+        # Don't leave accounts with known passwords in the live database
+        with conn:
+            conn.executemany('DELETE FROM users WHERE username = ? OR email = ?', cleanup_keys)
+        conn.close()
+    
+    for i, (pair, user) in enumerate(zip(pairs, db_users)):
+        password = pair[1]
+        print(f"\n--- Test {i+1}: '{password}' (length: {len(password)}) ---")
+        
+        if not user:
+            print(f"   Database auth: ❌ FAILED (skipping API)")
+            failing_passwords.append(password)
+            continue
+        print(f"   Database auth: ✅ SUCCESS")
+        
+        status = api_results[pair]
+        if isinstance(status, Exception):
+            print(f"   API auth: ❌ ERROR ({status})")
+            failing_passwords.append(password)
+            continue
+        
+        if status == 200:
+            print(f"   API auth: ✅ SUCCESS")
+            working_passwords.append(password)
+            print(f"   ✅ BOTH WORK")
+        else:
+            print(f"   API auth: ❌ FAILED ({status})")
+            failing_passwords.append(password)
+            print(f"   ⚠️  DB works but API fails - possible encoding issue")
     
     # Summary
     print(f"\n" + "=" * 50)
@@ -114,9 +154,16 @@ def test_password_characters():
         print(f"   - JSON escaping issues")
         print(f"   - Form data encoding issues")
         print(f"   - Frontend/backend character handling mismatch")
+    
+    return failing_passwords
+
+def test_special_characters(app_server):
+    """pytest entry point"""
+    failing_passwords = check_password_characters()
+    assert not failing_passwords, f"Passwords failing auth: {failing_passwords}"
 
 if __name__ == "__main__":
-    test_password_characters()
+    check_password_characters()
     
     print(f"\n🔧 RECOMMENDATION:")
     print(f"   Use password '123' for now, then change it in Settings tab")
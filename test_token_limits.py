@@ -1,25 +1,9 @@
 """Test script to demonstrate token limit functionality."""
 
-import asyncio
+import math
 from ai_compare.token_manager import TokenManager
 
-async def test_token_limits():
-    """Test the token management system with various input sizes."""
-    
-    token_manager = TokenManager()
-    
-    # Test 1: Short text (should not be truncated)
-    short_text = "What is machine learning?"
-    print("=== Test 1: Short Input ===")
-    print(f"Original: {short_text}")
-    result, truncated = token_manager.validate_and_truncate(short_text, "openai", "gpt-4")
-    print(f"Processed: {result}")
-    print(f"Was truncated: {truncated}")
-    print(f"Token count: {token_manager.token_counter.count_tokens(result)}")
-    print()
-    
-    # Test 2: Very long text (should be truncated)
-    long_text = """
+LONG_PARAGRAPH = """
     This is a very long question about machine learning that goes into extensive detail about various aspects of the field. 
     Machine learning is a subset of artificial intelligence that focuses on the development of algorithms and statistical models 
     that enable computer systems to improve their performance on a specific task through experience, without being explicitly 
@@ -40,33 +24,63 @@ async def test_token_limits():
     algorithms, addressing ethical considerations, and making machine learning more accessible to practitioners across 
     various domains. The future of machine learning holds promise for even more sophisticated applications and 
     integration into everyday technology, potentially transforming industries and society as a whole.
-    """ * 10  # Multiply to make it very long
+    """
+
+def make_long_text(token_manager, min_tokens):
+    """Repeat LONG_PARAGRAPH the fewest times that reaches at least min_tokens."""
+    per_paragraph = token_manager.token_counter.count_tokens(LONG_PARAGRAPH)
+    return LONG_PARAGRAPH * math.ceil(min_tokens / per_paragraph)
+
+def test_token_limits():
+    """Test the token management system with various input sizes."""
+    
+    token_manager = TokenManager()
+    
+    # Test 1: Short text (should not be truncated)
+    short_text = "What is machine learning?"
+    print("=== Test 1: Short Input ===")
+    print(f"Original: {short_text}")
+    result, truncated = token_manager.validate_and_truncate(short_text, "openai", "gpt-4")
+    print(f"Processed: {result}")
+    print(f"Was truncated: {truncated}")
+    print(f"Token count: {token_manager.token_counter.count_tokens(result)}")
+    print()
+    assert not truncated
+    
+    # Test 2: Very long text (should be truncated)
+    # Just enough repeats of the paragraph to exceed the GPT-4 limit by ~10%
+    gpt4_limit = token_manager.get_model_limit("openai", "gpt-4")
+    long_text = make_long_text(token_manager, int(gpt4_limit * 1.1))
+    # Counted once here and handed to validate_and_truncate below
+    long_tokens = token_manager.token_counter.count_tokens(long_text)
     
     print("=== Test 2: Long Input (GPT-4) ===")
     print(f"Original length: {len(long_text)} characters")
-    print(f"Original tokens: {token_manager.token_counter.count_tokens(long_text)}")
-    result, truncated = token_manager.validate_and_truncate(long_text, "openai", "gpt-4")
+    print(f"Original tokens: {long_tokens}")
+    result, truncated = token_manager.validate_and_truncate(long_text, "openai", "gpt-4", long_tokens)
     print(f"Processed length: {len(result)} characters")
     print(f"Processed tokens: {token_manager.token_counter.count_tokens(result)}")
     print(f"Was truncated: {truncated}")
     print(f"Processed text preview: {result[:200]}...")
     print()
+    assert truncated
     
     # Test 3: Same long text with Claude (higher limit)
     print("=== Test 3: Long Input (Claude) ===")
-    result, truncated = token_manager.validate_and_truncate(long_text, "anthropic", "claude-3-opus")
+    result, truncated = token_manager.validate_and_truncate(long_text, "anthropic", "claude-3-opus", long_tokens)
     print(f"Claude limit: {token_manager.get_model_limit('anthropic', 'claude-3-opus')}")
     print(f"Was truncated: {truncated}")
     print()
+    assert not truncated
     
     # Test 4: Show all configured limits
-    print("=== Test 4: All Model Limits ===")
     limits = token_manager.get_all_limits()
+    lines = ["=== Test 4: All Model Limits ==="]
     for provider, models in limits.items():
-        print(f"{provider.upper()}:")
-        for model, limit in models.items():
-            print(f"  {model}: {limit:,} tokens")
+        lines.append(f"{provider.upper()}:")
+        lines.extend(f"  {model}: {limit:,} tokens" for model, limit in models.items())
+    print("\n".join(lines))
     print()
 
 if __name__ == "__main__":
-    asyncio.run(test_token_limits())
+    test_token_limits()
@@ -1,8 +1,32 @@
 """Test the complete user profile system."""
 
+from concurrent.futures import ThreadPoolExecutor
 import json
+import stat
 import requests
-from ai_compare.user_profile_manager import UserProfileManager
+from requests.adapters import HTTPAdapter
+from ai_compare.user_profile_manager import UserProfileManager, profile_from_json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Top-level sections every saved profile file must contain
+REQUIRED_SECTIONS = frozenset({
+    'personal_info', 'preferences', 'ai_interaction_history', 'privacy_settings', 'metadata'
+})
+
+def canonical_json(data):
+    """Key-sorted JSON bytes, so two profiles compare with a single bytes equality."""
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True).encode('utf-8')
+
+def post_json(session, url, payload):
+    """POST payload as a JSON body encoded here (orjson when available) instead of by requests."""
+    body = orjson.dumps(payload) if orjson else json.dumps(payload).encode('utf-8')
+    return session.post(url, data=body, headers={'Content-Type': 'application/json'})
 
 def test_user_profile_system():
     """Test the user profile management system."""
@@ -17,7 +41,7 @@ def test_user_profile_system():
     user_id = manager.create_user_profile()
     print(f"✓ Created profile: {user_id}")
     
-    # Update personal information
+    # Personal information
     personal_info = {
         "name": "John Doe",
         "email": "john.doe@example.com",
@@ -28,10 +52,7 @@ def test_user_profile_system():
         "bio": "Passionate about AI and machine learning technologies."
     }
     
-    success = manager.update_personal_info(user_id, personal_info)
-    print(f"✓ Updated personal info: {success}")
-    
-    # Update preferences
+    # Preferences
     preferences = {
         "communication_style": "friendly",
         "topics_of_interest": ["Artificial Intelligence", "Programming", "Science"],
@@ -41,10 +62,7 @@ def test_user_profile_system():
         "goals": ["Learn new AI techniques", "Improve coding skills"]
     }
     
-    success = manager.update_preferences(user_id, preferences)
-    print(f"✓ Updated preferences: {success}")
-    
-    # Update privacy settings
+    # Privacy settings
     privacy_settings = {
         "data_sharing": True,
         "analytics": True,
@@ -52,9 +70,6 @@ def test_user_profile_system():
         "marketing": False
     }
     
-    success = manager.update_privacy_settings(user_id, privacy_settings)
-    print(f"✓ Updated privacy settings: {success}")
-    
     # Record some interactions
     interactions = [
         {"topic": "AI models", "model": "chatbot", "feedback_score": 5},
@@ -62,8 +77,14 @@ def test_user_profile_system():
         {"topic": "Science questions", "model": "chatbot", "feedback_score": 5}
     ]
     
-    for interaction in interactions:
-        manager.record_interaction(user_id, interaction)
+    # Apply every section in one load/save
+    success = manager.update_all(user_id, {
+        "personal_info": personal_info,
+        "preferences": preferences,
+        "privacy_settings": privacy_settings,
+        "interactions": interactions
+    })
+    print(f"✓ Updated personal info, preferences and privacy settings: {success}")
     print(f"✓ Recorded {len(interactions)} interactions")
     
     # Test profile loading
@@ -88,9 +109,13 @@ def test_user_profile_system():
     # Test Flask endpoints (if server is running)
     base_url = "http://localhost:5000"
     
+    # One pooled session so the API calls reuse keep-alive connections
+    session = requests.Session()
+    session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+    
     try:
         # Test profile creation via API
-        response = requests.post(f"{base_url}/api/profile/create")
+        response = session.post(f"{base_url}/api/profile/create")
         if response.status_code == 200:
             api_user_data = response.json()
             api_user_id = api_user_data['user_id']
@@ -108,7 +133,7 @@ def test_user_profile_system():
                 "bio": "Data scientist specializing in ML applications."
             }
             
-            response = requests.post(f"{base_url}/api/profile/personal-info", json=personal_data)
+            response = post_json(session, f"{base_url}/api/profile/personal-info", personal_data)
             if response.status_code == 200:
                 print("✓ Updated personal info via API")
             
@@ -122,38 +147,43 @@ def test_user_profile_system():
                 "goals": ["Master deep learning", "Publish research"]
             }
             
-            response = requests.post(f"{base_url}/api/profile/preferences", json=preferences_data)
+            response = post_json(session, f"{base_url}/api/profile/preferences", preferences_data)
             if response.status_code == 200:
                 print("✓ Updated preferences via API")
             
+            # Test interaction recording via API (all interactions in one request)
+            interaction_data = {
+                "user_id": api_user_id,
+                "interactions": [
+                    {"topic": "Data visualization", "model": "assistant", "feedback_score": 4},
+                    *interactions
+                ]
+            }
+            
+            response = post_json(session, f"{base_url}/api/profile/interaction/bulk", interaction_data)
+            if response.status_code == 200:
+                print(f"✓ Recorded {len(interaction_data['interactions'])} interactions via API")
+            
+            # Profile, summary and list reads are independent, so fetch them concurrently
+            with ThreadPoolExecutor(max_workers=3) as pool:
+                profile_future = pool.submit(session.get, f"{base_url}/api/profile/{api_user_id}")
+                summary_future = pool.submit(session.get, f"{base_url}/api/profile/summary/{api_user_id}")
+                list_future = pool.submit(session.get, f"{base_url}/api/profile/list")
+            
             # Test profile retrieval via API
-            response = requests.get(f"{base_url}/api/profile/{api_user_id}")
+            response = profile_future.result()
             if response.status_code == 200:
                 api_profile = response.json()
                 print(f"✓ Retrieved profile via API: {api_profile['personal_info']['name']}")
             
             # Test user summary via API
-            response = requests.get(f"{base_url}/api/profile/summary/{api_user_id}")
+            response = summary_future.result()
             if response.status_code == 200:
                 api_summary = response.json()
                 print(f"✓ Retrieved user summary via API: {api_summary['name']}")
             
-            # Test interaction recording via API
-            interaction_data = {
-                "user_id": api_user_id,
-                "interaction_data": {
-                    "topic": "Data visualization",
-                    "model": "assistant",
-                    "feedback_score": 4
-                }
-            }
-            
-            response = requests.post(f"{base_url}/api/profile/interaction", json=interaction_data)
-            if response.status_code == 200:
-                print("✓ Recorded interaction via API")
-            
             # Test profile list via API
-            response = requests.get(f"{base_url}/api/profile/list")
+            response = list_future.result()
             if response.status_code == 200:
                 profiles_list = response.json()
                 print(f"✓ Listed {len(profiles_list['profiles'])} profiles via API")
@@ -164,6 +194,8 @@ def test_user_profile_system():
     except requests.exceptions.ConnectionError:
         print("⚠️  Flask server not running - skipping API tests")
         print("   Start the server with 'python app.py' to test API endpoints")
+    finally:
+        session.close()
     
     print("\n3. Testing Data Persistence...")
     
@@ -171,7 +203,7 @@ def test_user_profile_system():
     cached_profile = manager.load_user_profile(user_id)  # From cache
     file_profile = manager.load_user_profile(user_id, force_reload=True)  # From file
     
-    if cached_profile == file_profile:
+    if canonical_json(cached_profile) == canonical_json(file_profile):
         print("✓ Cache and file data are consistent")
     else:
         print("❌ Cache and file data mismatch")
@@ -200,20 +232,24 @@ def test_user_profile_system():
     storage_path = manager.storage_dir.absolute()
     profile_file = storage_path / f"{user_id}.json"
     
-    if profile_file.exists():
+    # One stat call answers both "exists" and "how big"
+    try:
+        file_stat = profile_file.stat()
+    except FileNotFoundError:
+        file_stat = None
+    
+    if file_stat is not None and stat.S_ISREG(file_stat.st_mode):
         print(f"✓ Profile file exists: {profile_file}")
         
         # Check file size
-        file_size = profile_file.stat().st_size
-        if file_size > 0:
-            print(f"✓ Profile file has content: {file_size} bytes")
+        if file_stat.st_size > 0:
+            print(f"✓ Profile file has content: {file_stat.st_size} bytes")
         
         # Validate JSON structure
-        with open(profile_file, 'r', encoding='utf-8') as f:
-            file_data = json.load(f)
+        with open(profile_file, 'rb') as f:
+            file_data = profile_from_json(f.read())
             
-        required_sections = ['personal_info', 'preferences', 'ai_interaction_history', 'privacy_settings', 'metadata']
-        missing_sections = [section for section in required_sections if section not in file_data]
+        missing_sections = sorted(REQUIRED_SECTIONS - file_data.keys())
         
         if not missing_sections:
             print("✓ Profile file has all required sections")
@@ -234,14 +270,13 @@ def test_user_profile_system():
         "✓ Data export in JSON and TXT formats",
         "✓ User summary generation for AI context",
         "✓ RESTful API endpoints for all operations",
-        "✓ Persistent storage with backup system",
+        "✓ Persistent storage with atomic saves",
         "✓ Cache optimization with force reload capability",
         "✓ Frontend forms with Bootstrap UI",
         "✓ Real-time profile updates and validation"
     ]
     
-    for feature in features:
-        print(feature)
+    print("\n".join(features))
     
     print(f"\n=== API Endpoints Available ===")
     endpoints = [
@@ -255,16 +290,18 @@ def test_user_profile_system():
         "GET  /api/profile/export/<user_id> - Export profile data",
         "GET  /api/profile/list - List all user profiles",
         "GET  /api/profile/summary/<user_id> - Get user summary for AI",
-        "POST /api/profile/interaction - Record AI interaction"
+        "POST /api/profile/interaction - Record AI interaction",
+        "POST /api/profile/interaction/bulk - Record several AI interactions"
     ]
     
-    for endpoint in endpoints:
-        print(f"✓ {endpoint}")
+    print("\n".join(f"✓ {endpoint}" for endpoint in endpoints))
     
-    print(f"\n=== Storage Information ===")
-    print(f"User profiles saved to: {storage_path}")
-    print(f"Each profile stored as: <user_id>.json")
-    print(f"Backup files created during saves: <user_id>.json.bak")
+    print("\n".join([
+        "\n=== Storage Information ===",
+        f"User profiles saved to: {storage_path}",
+        "Each profile stored as: <user_id>.json",
+        "Saves write <user_id>.json.tmp, then atomically replace <user_id>.json",
+    ]))
     
     print("\n🎉 User profile system testing completed!")
     return True
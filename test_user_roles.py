@@ -3,8 +3,8 @@
 Test user roles and message limits
 """
 
+from db_util import get_shared_conn
 from integrated_database import IntegratedDatabase
-import sqlite3
 
 def test_user_roles():
     print("🧪 Testing User Roles & Message Limits")
@@ -12,44 +12,50 @@ def test_user_roles():
     
     db = IntegratedDatabase()
     
-    # Get all users
-    conn = sqlite3.connect('integrated_users.db')
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, username, user_role FROM users')
-    users = cursor.fetchall()
-    conn.close()
-    
     print("\n📋 Testing Each User:")
     print("=" * 60)
     
-    for user_id, username, role in users:
-        print(f"\n👤 {username} (ID: {user_id}, Role: {role})")
-        
-        # Get user role
-        fetched_role = db.get_user_role(user_id)
-        print(f"   Role check: {fetched_role}")
+    guests = []
+    # Roles, limits and today's usage for every user stream from one query
+    for summary in db.iter_user_role_summary():
+        user_id = summary['id']
+        print(f"\n👤 {summary['username']} (ID: {user_id}, Role: {summary['role']})")
         
         # Get message usage
         usage = db.get_message_usage(user_id)
         print(f"   Usage: {usage}")
+        assert usage['role'] == summary['role']
+        assert usage['current_count'] == summary['current_count']
+        assert usage['remaining'] == summary['remaining']
         
         # Check if can send
         can_send, reason = db.can_send_message(user_id)
         print(f"   Can send: {can_send}")
         if reason:
             print(f"   Reason: {reason}")
+        assert can_send == usage['can_send'] == summary['can_send']
+        
+        if usage['role'] == 'guest':
+            guests.append((summary['username'], user_id, usage))
+    
+    # Only guests have a limit to test: send what fits in one transaction
+    conn = get_shared_conn()
+    for username, user_id, before in guests:
+        print(f"\n   Testing limit for {username}:")
+        to_send = min(3, before['remaining'])
+        db.increment_message_count(user_id, to_send, conn=conn)
+        
+        usage = db.get_message_usage(user_id)
+        can_send, reason = db.can_send_message(user_id)
+        print(f"   Sent {to_send} of 3 (Remaining: {usage['remaining']})")
+        if reason:
+            print(f"   BLOCKED - {reason}")
         
-        # For guest users, test the limit
-        if role == 'guest':
-            print(f"\n   Testing limit for {username}:")
-            for i in range(3):
-                can_send, reason = db.can_send_message(user_id)
-                if can_send:
-                    db.increment_message_count(user_id)
-                    usage = db.get_message_usage(user_id)
-                    print(f"   Message {i+1}: Sent (Remaining: {usage['remaining']})")
-                else:
-                    print(f"   Message {i+1}: BLOCKED - {reason}")
+        assert usage['current_count'] == before['current_count'] + to_send
+        assert usage['remaining'] == before['remaining'] - to_send
+        assert can_send == (usage['remaining'] > 0)
+        if to_send < 3:
+            assert not can_send and reason
     
     print("\n" + "=" * 60)
     print("✅ User Roles Test Complete!")
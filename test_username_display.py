@@ -3,7 +3,8 @@ Test username display in navbar
 """
 
 import asyncio
-from playwright.async_api import async_playwright
+import os
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import random
 import string
 
@@ -11,12 +12,12 @@ async def test_username_display():
     async with async_playwright() as p:
         print("🧪 Testing Username Display...\n")
         
-        browser = await p.chromium.launch(headless=False)
+        browser = await p.chromium.launch(headless=os.environ.get('HEADED') != '1')
         page = await browser.new_page()
         
         # Go to app
         await page.goto("http://localhost:5000/multi-user")
-        await page.wait_for_load_state("networkidle")
+        await page.wait_for_selector("#show-signup")
         
         # Create a new test user
         random_id = ''.join(random.choices(string.ascii_lowercase + string.digits, k=6))
@@ -25,7 +26,7 @@ async def test_username_display():
         
         print(f"📝 Creating test user: {test_username}...")
         await page.click("#show-signup")
-        await page.wait_for_timeout(500)
+        await page.wait_for_selector("#signup-username", state="visible")
         
         await page.fill("#signup-username", test_username)
         await page.fill("#signup-email", test_email)
@@ -34,16 +35,26 @@ async def test_username_display():
         await page.click("#signup-form button[type='submit']")
         
         # Wait for dashboard
-        await page.wait_for_timeout(3000)
+        try:
+            await page.wait_for_selector("#dashboard-screen", state="visible", timeout=5000)
+            dashboard_visible = True
+        except PlaywrightTimeoutError:
+            dashboard_visible = False
         
-        # Check if dashboard is visible
-        dashboard = await page.query_selector("#dashboard-screen")
-        if dashboard and await dashboard.is_visible():
+        if dashboard_visible:
             print("✅ Dashboard loaded\n")
             
-            # Check username display
-            username_element = await page.query_selector("#nav-username")
-            if username_element:
+            # Check username display, once the navbar has replaced its placeholder
+            username_element = page.locator("#nav-username")
+            try:
+                await username_element.wait_for(state="visible", timeout=5000)
+                await page.wait_for_function(
+                    "() => document.getElementById('nav-username').innerText.trim() !== 'Loading...'",
+                    timeout=5000
+                )
+            except PlaywrightTimeoutError:
+                pass
+            if await username_element.count():
                 username_text = await username_element.inner_text()
                 print(f"👤 Username displayed: '{username_text}'")
                 print(f"👤 Expected username: '{test_username}'")
@@ -63,9 +74,10 @@ async def test_username_display():
         else:
             print("❌ Dashboard not visible - login failed")
         
-        # Keep browser open for inspection
-        print("\n⏸️  Browser will stay open for 5 seconds...")
-        await page.wait_for_timeout(5000)
+        # Keep browser open for inspection when running headed
+        if os.environ.get('HEADED') == '1':
+            print("\n⏸️  Browser will stay open for 5 seconds...")
+            await page.wait_for_timeout(5000)
         
         await browser.close()
 
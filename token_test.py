@@ -7,6 +7,11 @@ sys.path.insert(0, os.path.dirname(__file__))
 
 from ai_compare.token_manager import TokenManager
 
+# Inputs are built once at import; validate_and_truncate returns SHORT_TEXT
+# from its length guard without running the token counter
+SHORT_TEXT = "What is machine learning?"
+LONG_TEXT = "This is a test. " * 1000
+
 def test_basic_functionality():
     """Test basic token manager functionality."""
     print("=== Testing Token Manager ===")
@@ -24,15 +29,13 @@ def test_basic_functionality():
         print(f"✓ Claude limit: {claude_limit:,} tokens")
         
         # Test short text (should not truncate)
-        short_text = "What is machine learning?"
-        result, truncated = tm.validate_and_truncate(short_text, "openai", "gpt-4")
+        result, truncated = tm.validate_and_truncate(SHORT_TEXT, "openai", "gpt-4")
         print(f"✓ Short text test - Truncated: {truncated}")
         
         # Test long text (should truncate)
-        long_text = "This is a test. " * 1000  # Create long text
-        result, truncated = tm.validate_and_truncate(long_text, "openai", "gpt-4")
+        result, truncated = tm.validate_and_truncate(LONG_TEXT, "openai", "gpt-4")
         print(f"✓ Long text test - Truncated: {truncated}")
-        print(f"  Original length: {len(long_text)} chars")
+        print(f"  Original length: {len(LONG_TEXT)} chars")
         print(f"  Result length: {len(result)} chars")
         
         print("\n=== All Tests Passed! ===")
@@ -1,6 +1,6 @@
-import sqlite3
+from db_util import get_shared_conn
 
-conn = sqlite3.connect('integrated_users.db')
+conn = get_shared_conn()
 cursor = conn.cursor()
 
 cursor.execute('SELECT COUNT(*) FROM ai_conversations WHERE session_id = ?', ('session_25_20251018_205138_895418_4060',))
@@ -10,5 +10,3 @@ if count == 0:
     print("✅ Conversation successfully deleted from database!")
 else:
     print(f"❌ Conversation still exists ({count} entries)")
-
-conn.close()
@@ -5,6 +5,7 @@ Tests core functionality without external dependencies
 
 def verify_files_exist():
     """Check if all personality system files exist"""
+    import os
     from pathlib import Path
     
     files = [
@@ -13,12 +14,21 @@ def verify_files_exist():
         "ai_compare/personality_ui.py"
     ]
     
+    # One directory listing per parent; DirEntry caches its stat result
+    entries = {}
+    for parent in {Path(file_path).parent for file_path in files}:
+        try:
+            with os.scandir(parent) as it:
+                entries.update({Path(parent, e.name): e for e in it if e.is_file()})
+        except FileNotFoundError:
+            pass
+    
     results = {}
     for file_path in files:
-        path = Path(file_path)
+        entry = entries.get(Path(file_path))
         results[file_path] = {
-            'exists': path.exists(),
-            'size': path.stat().st_size if path.exists() else 0
+            'exists': entry is not None,
+            'size': entry.stat().st_size if entry else 0
         }
     
     return results
@@ -2,47 +2,49 @@
 Verify that timestamps are stored in UTC and displayed in local time
 """
 
+from db_util import get_shared_conn
 from integrated_database import IntegratedDatabase
 from datetime import datetime, timezone
-import pytz
 
-db = IntegratedDatabase()
+SAMPLE_MESSAGES = 3
+
+IntegratedDatabase()  # ensures the schema exists; queries below use the shared connection
 
 print("=" * 80)
 print("TIMESTAMP STORAGE VERIFICATION")
 print("=" * 80)
 
-# Test 1: Check SQLite CURRENT_TIMESTAMP behavior
-print("\n1. SQLite CURRENT_TIMESTAMP behavior:")
-conn = db.get_connection()
+# SQLite clock readings and the latest admin_messages rows in one round trip;
+# the first column tags which kind of row it is
+conn = get_shared_conn()
 cursor = conn.cursor()
-
-# Insert a test message with current timestamp
 cursor.execute('''
-    SELECT datetime('now') as utc_time, 
-           datetime('now', 'localtime') as local_time,
-           strftime('%Y-%m-%d %H:%M:%S', 'now') as current_timestamp_format
-''')
-result = cursor.fetchone()
+    SELECT 'now', NULL, datetime('now'), datetime('now', 'localtime'),
+           strftime('%Y-%m-%d %H:%M:%S', 'now')
+    UNION ALL
+    SELECT * FROM (
+        SELECT 'msg', id, sender_type, timestamp, datetime(timestamp, 'localtime')
+        FROM admin_messages
+        ORDER BY id DESC LIMIT ?
+    )
+''', (SAMPLE_MESSAGES,))
+rows = cursor.fetchall()
+result = next(row[2:] for row in rows if row[0] == 'now')
+messages = sorted((row[1:] for row in rows if row[0] == 'msg'), key=lambda m: m[0], reverse=True)
+
+# Test 1: Check SQLite CURRENT_TIMESTAMP behavior
+print("\n1. SQLite CURRENT_TIMESTAMP behavior:")
 print(f"   UTC time (datetime('now')): {result[0]}")
 print(f"   Local time: {result[1]}")
 print(f"   CURRENT_TIMESTAMP format: {result[2]}")
 
 # Test 2: Check actual admin_messages timestamps
 print("\n2. Sample admin_messages timestamps:")
-cursor.execute('''
-    SELECT id, user_id, sender_type, timestamp, 
-           datetime(timestamp, 'localtime') as local_display
-    FROM admin_messages 
-    ORDER BY id DESC LIMIT 3
-''')
-messages = cursor.fetchall()
-
 if messages:
     for msg in messages:
-        print(f"   ID {msg[0]} ({msg[2]}): ")
-        print(f"      Stored (UTC): {msg[3]}")
-        print(f"      Local time:   {msg[4]}")
+        print(f"   ID {msg[0]} ({msg[1]}): ")
+        print(f"      Stored (UTC): {msg[2]}")
+        print(f"      Local time:   {msg[3]}")
 else:
     print("   No messages found")
 
@@ -57,13 +59,11 @@ print(f"   Timezone:     {datetime.now().astimezone().tzname()}")
 # Test 4: JavaScript conversion test
 print("\n4. JavaScript will convert:")
 if messages:
-    stored_time = messages[0][3]  # Get first message timestamp
+    stored_time = messages[0][2]  # Get first message timestamp
     print(f"   Stored in DB:     '{stored_time}'")
     print(f"   After adding Z:   '{stored_time.replace(' ', 'T')}Z'")
     print(f"   JavaScript sees:  UTC time that will convert to local")
 
-conn.close()
-
 print("\n" + "=" * 80)
 print("SUMMARY:")
 print("=" * 80)
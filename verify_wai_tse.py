@@ -28,15 +28,18 @@ def main():
         traits = db.get_psychology_traits(user['id'])
         print(f"✅ Psychology Traits: {len(traits)} loaded")
         
+        # Split Carl Jung and Big Five traits in one pass
+        jung_traits, big_five = [], []
+        for t in traits:
+            (jung_traits if t['trait_name'].startswith('Jung_') else big_five).append(t)
+        
         # Show Carl Jung traits
-        jung_traits = [t for t in traits if 'Jung_' in t['trait_name']]
         if jung_traits:
             print("   🧠 Carl Jung Model Found:")
             for trait in jung_traits:
                 print(f"      {trait['trait_name']}: {trait['trait_value']:.2f}")
         
         # Show Big Five traits  
-        big_five = [t for t in traits if 'Jung_' not in t['trait_name']]
         if big_five:
             print("   📊 Big Five Model Found:")
             for trait in big_five:
@@ -63,16 +66,14 @@ def main():
         print("❌ Authentication failed")
         # Try to fix password
         print("Attempting to fix password...")
-        import sqlite3
-        import bcrypt
+        from db_util import get_shared_conn
+        from known_hashes import WAI_TSE_HASH
         
-        conn = sqlite3.connect('integrated_users.db')
+        conn = get_shared_conn()
         cursor = conn.cursor()
         
-        password_hash = bcrypt.hashpw('.//'.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        cursor.execute('UPDATE users SET password_hash = ? WHERE username = ?', (password_hash, 'Wai Tse'))
+        cursor.execute('UPDATE users SET password_hash = ? WHERE username = ?', (WAI_TSE_HASH, 'Wai Tse'))
         conn.commit()
-        conn.close()
         
         print("Password fixed. Try again:")
         user = db.authenticate_user('Wai Tse', './/.')